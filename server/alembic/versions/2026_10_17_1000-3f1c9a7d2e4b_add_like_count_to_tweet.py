@@ -0,0 +1,37 @@
+"""add like_count to tweet
+
+Revision ID: 3f1c9a7d2e4b
+Revises: bd82b8cc015c
+Create Date: 2026-10-17 10:00:12.381904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c9a7d2e4b"
+down_revision: Union[str, None] = "bd82b8cc015c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tweet",
+        sa.Column("like_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_index(
+        "ix_tweet_like_count_id",
+        "tweet",
+        ["like_count", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tweet_like_count_id", table_name="tweet")
+    op.drop_column("tweet", "like_count")
@@ -0,0 +1,37 @@
+"""backfill tweet like_count
+
+Revision ID: 8a2d6e0b5c71
+Revises: 3f1c9a7d2e4b
+Create Date: 2026-10-17 10:05:47.102655
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8a2d6e0b5c71"
+down_revision: Union[str, None] = "3f1c9a7d2e4b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE tweet
+        SET like_count = likes.count
+        FROM (
+            SELECT tweet_id, count(*) AS count
+            FROM tweet_like
+            GROUP BY tweet_id
+        ) AS likes
+        WHERE tweet.id = likes.tweet_id
+        """
+    )
+
+
+def downgrade() -> None:
+    pass
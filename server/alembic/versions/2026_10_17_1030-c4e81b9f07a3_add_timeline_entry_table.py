@@ -0,0 +1,50 @@
+"""add timeline_entry table
+
+Revision ID: c4e81b9f07a3
+Revises: 8a2d6e0b5c71
+Create Date: 2026-10-17 10:30:05.914273
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4e81b9f07a3"
+down_revision: Union[str, None] = "8a2d6e0b5c71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "timeline_entry",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("tweet_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.ForeignKeyConstraint(["tweet_id"], ["tweet.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "tweet_id", name="uq_timeline_entry_user_id_tweet_id"
+        ),
+    )
+    op.create_index(
+        "ix_timeline_entry_user_id_score_tweet_id",
+        "timeline_entry",
+        ["user_id", "score", "tweet_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_timeline_entry_user_id_score_tweet_id",
+        table_name="timeline_entry",
+    )
+    op.drop_table("timeline_entry")
@@ -0,0 +1,39 @@
+"""add uploader_api_key to media
+
+Revision ID: 5b7e2c94d1f8
+Revises: c4e81b9f07a3
+Create Date: 2026-10-17 11:00:41.527310
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e2c94d1f8"
+down_revision: Union[str, None] = "c4e81b9f07a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "media",
+        sa.Column("uploader_api_key", sa.String(), nullable=True),
+    )
+    op.create_foreign_key(
+        "media_uploader_api_key_fkey",
+        "media",
+        "user",
+        ["uploader_api_key"],
+        ["api_key"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("media_uploader_api_key_fkey", "media", type_="foreignkey")
+    op.drop_column("media", "uploader_api_key")
@@ -0,0 +1,51 @@
+"""add foreign key and hot path indexes
+
+Revision ID: e9d03f6a8c25
+Revises: 5b7e2c94d1f8
+Create Date: 2026-10-17 11:30:18.660412
+
+"""
+
+from typing import Sequence, Union, List, Tuple
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e9d03f6a8c25"
+down_revision: Union[str, None] = "5b7e2c94d1f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES: List[Tuple[str, str, List[str]]] = [
+    ("ix_tweet_author_api_key", "tweet", ["author_api_key"]),
+    ("ix_tweet_like_tweet_id", "tweet_like", ["tweet_id"]),
+    ("ix_follower_following_id", "follower", ["following_id"]),
+    ("ix_media_tweet_id", "media", ["tweet_id"]),
+    ("ix_timeline_entry_tweet_id", "timeline_entry", ["tweet_id"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
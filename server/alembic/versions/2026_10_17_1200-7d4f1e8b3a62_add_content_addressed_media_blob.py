@@ -0,0 +1,48 @@
+"""add content addressed media_blob
+
+Revision ID: 7d4f1e8b3a62
+Revises: e9d03f6a8c25
+Create Date: 2026-10-17 12:00:33.208117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d4f1e8b3a62"
+down_revision: Union[str, None] = "e9d03f6a8c25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "media_blob",
+        sa.Column("sha256", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id"),
+        sa.UniqueConstraint("sha256"),
+    )
+    op.add_column("media", sa.Column("sha256", sa.String(), nullable=True))
+    op.create_index("ix_media_sha256", "media", ["sha256"], unique=False)
+    op.create_foreign_key(
+        "media_sha256_fkey",
+        "media",
+        "media_blob",
+        ["sha256"],
+        ["sha256"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("media_sha256_fkey", "media", type_="foreignkey")
+    op.drop_index("ix_media_sha256", table_name="media")
+    op.drop_column("media", "sha256")
+    op.drop_table("media_blob")
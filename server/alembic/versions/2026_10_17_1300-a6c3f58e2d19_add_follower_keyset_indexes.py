@@ -0,0 +1,65 @@
+"""add follower keyset indexes
+
+Revision ID: a6c3f58e2d19
+Revises: 7d4f1e8b3a62
+Create Date: 2026-10-17 13:00:47.512093
+
+"""
+
+from typing import Sequence, Union, List, Tuple
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6c3f58e2d19"
+down_revision: Union[str, None] = "7d4f1e8b3a62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES: List[Tuple[str, str, List[str]]] = [
+    ("ix_follower_following_id_id", "follower", ["following_id", "id"]),
+    ("ix_follower_follower_api_key_id", "follower", ["follower_api_key", "id"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+        # Покрывается префиксом ix_follower_following_id_id
+        op.drop_index(
+            "ix_follower_following_id",
+            table_name="follower",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_follower_following_id",
+            "follower",
+            ["following_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
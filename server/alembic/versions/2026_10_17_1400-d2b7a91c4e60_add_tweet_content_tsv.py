@@ -0,0 +1,57 @@
+"""add tweet content tsv
+
+Revision ID: d2b7a91c4e60
+Revises: a6c3f58e2d19
+Create Date: 2026-10-17 14:00:21.804317
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2b7a91c4e60"
+down_revision: Union[str, None] = "a6c3f58e2d19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Хранимая вычисляемая колонка заполняется для всех строк при добавлении
+    op.add_column(
+        "tweet",
+        sa.Column(
+            "content_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', content)", persisted=True),
+            nullable=True,
+        ),
+    )
+
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tweet_content_tsv",
+            "tweet",
+            ["content_tsv"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tweet_content_tsv",
+            table_name="tweet",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_column("tweet", "content_tsv")
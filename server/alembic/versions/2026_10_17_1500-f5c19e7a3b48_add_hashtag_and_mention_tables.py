@@ -0,0 +1,85 @@
+"""add hashtag and mention tables
+
+Revision ID: f5c19e7a3b48
+Revises: d2b7a91c4e60
+Create Date: 2026-10-17 15:00:38.217460
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f5c19e7a3b48"
+down_revision: Union[str, None] = "d2b7a91c4e60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "hashtag",
+        sa.Column("tag", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id"),
+        sa.UniqueConstraint("tag"),
+    )
+    op.create_table(
+        "tweet_hashtag",
+        sa.Column("tweet_id", sa.Integer(), nullable=False),
+        sa.Column("hashtag_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.ForeignKeyConstraint(["hashtag_id"], ["hashtag.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tweet_id"], ["tweet.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id"),
+        sa.UniqueConstraint(
+            "hashtag_id", "tweet_id", name="uq_tweet_hashtag_hashtag_id_tweet_id"
+        ),
+    )
+    op.create_index(
+        "ix_tweet_hashtag_tweet_id",
+        "tweet_hashtag",
+        ["tweet_id"],
+        unique=False,
+    )
+    op.create_table(
+        "mention",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_table(
+        "tweet_mention",
+        sa.Column("tweet_id", sa.Integer(), nullable=False),
+        sa.Column("mention_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.ForeignKeyConstraint(["mention_id"], ["mention.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tweet_id"], ["tweet.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id"),
+        sa.UniqueConstraint(
+            "mention_id", "tweet_id", name="uq_tweet_mention_mention_id_tweet_id"
+        ),
+    )
+    op.create_index(
+        "ix_tweet_mention_tweet_id",
+        "tweet_mention",
+        ["tweet_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tweet_mention_tweet_id", table_name="tweet_mention")
+    op.drop_table("tweet_mention")
+    op.drop_table("mention")
+    op.drop_index("ix_tweet_hashtag_tweet_id", table_name="tweet_hashtag")
+    op.drop_table("tweet_hashtag")
+    op.drop_table("hashtag")
@@ -0,0 +1,54 @@
+"""
+Заполнение хэштегов и упоминаний для твитов, созданных до появления
+таблиц hashtag и mention.
+
+Твиты обрабатываются порциями по BATCH_SIZE в порядке возрастания id,
+каждая порция фиксируется отдельной транзакцией. Повторный запуск
+безопасен: уже сохраненные связи пропускаются. Прерванный запуск можно
+продолжить с id последней обработанной порции.
+
+Запуск из каталога server: python -m scripts.backfill_tweet_terms [since_id]
+"""
+
+import asyncio
+import sys
+from typing import Sequence
+
+from sqlalchemy import Row, Select, select
+
+from src.database import async_session, engine
+from src.api.models import Tweet
+from src.api.service import index_tweet_terms
+
+BATCH_SIZE: int = 1000
+
+
+async def main(since_id: int = 0) -> None:
+    last_id: int = since_id
+    processed: int = 0
+
+    while True:
+        async with async_session() as session:
+            stmt: Select = (
+                select(Tweet.id, Tweet.content)
+                .where(Tweet.id > last_id)
+                .order_by(Tweet.id)
+                .limit(BATCH_SIZE)
+            )
+            rows: Sequence[Row] = (await session.execute(stmt)).all()
+
+            if not rows:
+                break
+
+            await index_tweet_terms(session, [(row.id, row.content) for row in rows])
+            await session.commit()
+
+        last_id = rows[-1].id
+        processed += len(rows)
+        print(f"processed {processed} tweets, last id {last_id}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 0))
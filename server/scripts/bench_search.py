@@ -0,0 +1,123 @@
+"""
+Бенчмарк полнотекстового поиска твитов на корпусе из миллиона твитов.
+
+Наполняет базу внутри транзакции, измеряет задержку запросов поиска
+через функцию сервиса и сравнивает ее с поиском ILIKE '%...%',
+после чего откатывает транзакцию. Словарь seed.py мал, поэтому каждое
+его слово встречается в сотнях тысяч твитов; редкое слово добавляется
+в каждый десятитысячный твит.
+
+Запуск из каталога server: python -m scripts.bench_search
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import Row, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import FEED_PAGE_SIZE
+from src.database import engine
+from src.api.service import search_tweets_json
+from scripts.seed import seed_dataset
+
+TWEETS: int = 1_000_000
+USERS: int = 10_000
+RARE_WORD: str = "zebra"
+RARE_EVERY: int = 10_000
+RUNS: int = 20
+
+
+async def measure(run: Callable[[], Awaitable[Any]]) -> Tuple[float, float]:
+    """
+    Функция измерения задержки запроса
+    :param run: Асинхронная функция запроса
+    :return: Медиана и 95-й перцентиль задержки в миллисекундах
+    """
+    await run()
+    timings: List[float] = []
+
+    for _ in range(RUNS):
+        started: float = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+async def main() -> None:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+
+        started: float = time.perf_counter()
+        await seed_dataset(conn, users=USERS, tweets=TWEETS, likes=0, follows=0)
+        await conn.execute(
+            text(
+                "UPDATE tweet SET content = content || ' ' || :word "
+                "WHERE author_api_key LIKE 'seed-%' AND id % :every = 0"
+            ),
+            {"word": RARE_WORD, "every": RARE_EVERY},
+        )
+        await conn.execute(text("ANALYZE tweet"))
+        print(f"seeded {TWEETS} tweets in {time.perf_counter() - started:.0f} s")
+
+        session: AsyncSession = AsyncSession(bind=conn)
+        author_id: int = await session.scalar(
+            text("SELECT id FROM \"user\" WHERE api_key = 'seed-1'"),
+        )
+        first_page: Sequence[Row] = await search_tweets_json(
+            session,
+            "coffee",
+            FEED_PAGE_SIZE,
+        )
+        cursor: Tuple[float, int] = (
+            first_page[FEED_PAGE_SIZE - 1].rank,
+            first_page[FEED_PAGE_SIZE - 1].id,
+        )
+
+        cases: List[Tuple[str, Dict[str, Any]]] = [
+            ("rare word", {"query": RARE_WORD}),
+            ("common word", {"query": "coffee"}),
+            ("common word, next page", {"query": "coffee", "cursor": cursor}),
+            ("two common words", {"query": "coffee code"}),
+            ("phrase", {"query": '"coffee code"'}),
+            ("common word, author", {"query": "coffee", "author_id": author_id}),
+        ]
+
+        for name, kwargs in cases:
+
+            async def run_search() -> Sequence[Row]:
+                return await search_tweets_json(
+                    session,
+                    limit=FEED_PAGE_SIZE,
+                    **kwargs,
+                )
+
+            p50, p95 = await measure(run_search)
+            print(f"search {name}: p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+
+        for word in (RARE_WORD, "coffee"):
+
+            async def run_ilike() -> Any:
+                return await conn.execute(
+                    text(
+                        "SELECT id FROM tweet WHERE content ILIKE :pattern "
+                        "ORDER BY id DESC LIMIT :limit"
+                    ),
+                    {"pattern": f"%{word}%", "limit": FEED_PAGE_SIZE + 1},
+                )
+
+            p50, p95 = await measure(run_ilike)
+            print(f"ILIKE {word}: p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+
+        await session.close()
+        await transaction.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
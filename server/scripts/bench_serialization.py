@@ -0,0 +1,157 @@
+"""
+Микробенчмарк сериализации ответов ленты и профиля юзера.
+
+Сравнивает прежний путь (валидация схем в builder, повторная валидация FastAPI
+по response_model и кодирование stdlib json) с текущим (model_construct
+и однократная сериализация через orjson). База данных не используется:
+builder получает объекты с теми же атрибутами, что и модели ORM.
+
+Запуск из каталога server: python -m scripts.bench_serialization
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, List, Type
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+
+from src.config import FOLLOW_PAGE_SIZE
+from src.api.schemas import TweetsOut, UserOut
+from src.api.utils import (
+    UserProfile,
+    build_get_tweets_response,
+    build_get_user_response,
+    build_json_response,
+)
+
+FEED_TWEETS: int = 50
+LIKES_PER_TWEET: int = 20
+ATTACHMENTS_PER_TWEET: int = 2
+USER_FOLLOWS: int = 100000
+DURATION: float = 2.0
+
+
+def make_tweets(count: int) -> List[SimpleNamespace]:
+    """
+    Функция построения страницы твитов с атрибутами модели Tweet
+    :param count: Количество твитов
+    :return: Список твитов
+    """
+    return [
+        SimpleNamespace(
+            id=tweet_id,
+            like_count=LIKES_PER_TWEET,
+            content=f"Tweet number {tweet_id} about coffee and code",
+            attachments=[
+                SimpleNamespace(id=tweet_id * 10 + i)
+                for i in range(ATTACHMENTS_PER_TWEET)
+            ],
+            author=SimpleNamespace(id=tweet_id % 7, name=f"user-{tweet_id % 7}"),
+            likes=[
+                SimpleNamespace(user=SimpleNamespace(id=i, name=f"user-{i}"))
+                for i in range(LIKES_PER_TWEET)
+            ],
+        )
+        for tweet_id in range(count, 0, -1)
+    ]
+
+
+def make_profile(follows: int) -> UserProfile:
+    """
+    Функция построения профиля юзера с первыми страницами подписчиков и подписок
+    :param follows: Количество подписчиков и подписок
+    :return: UserProfile
+    """
+    rows: List[SimpleNamespace] = [
+        SimpleNamespace(cursor_id=i, user_id=i, name=f"user-{i}")
+        for i in range(follows, follows - FOLLOW_PAGE_SIZE - 1, -1)
+    ]
+    return UserProfile(
+        user=SimpleNamespace(id=0, name="user-0"),  # type: ignore[arg-type]
+        followers_count=follows,
+        following_count=follows,
+        followers=rows,  # type: ignore[arg-type]
+        following=rows,  # type: ignore[arg-type]
+    )
+
+
+def previous_path(
+    schema: Type[BaseModel],
+    build: Callable[[], BaseModel],
+) -> Callable[[], Awaitable[bytes]]:
+    """
+    Функция построения прежнего пути ответа: схема валидируется в builder,
+    FastAPI валидирует ее повторно по response_model и кодирует stdlib json
+    :param schema: Схема response_model
+    :param build: Функция построения схемы
+    :return: Асинхронная функция, возвращающая тело ответа
+    """
+    field: Any = create_response_field(name="Response", type_=schema)
+
+    async def run() -> bytes:
+        model: BaseModel = schema.model_validate(build().model_dump())
+        content: Any = await serialize_response(field=field, response_content=model)
+        return JSONResponse(content).body
+
+    return run
+
+
+def current_path(build: Callable[[], BaseModel]) -> Callable[[], Awaitable[bytes]]:
+    """
+    Функция построения текущего пути ответа: схема из model_construct
+    сериализуется один раз и кодируется orjson
+    :param build: Функция построения схемы
+    :return: Асинхронная функция, возвращающая тело ответа
+    """
+
+    async def run() -> bytes:
+        return build_json_response(build()).body
+
+    return run
+
+
+async def measure(run: Callable[[], Awaitable[bytes]]) -> float:
+    """
+    Функция измерения пропускной способности
+    :param run: Асинхронная функция построения ответа
+    :return: Количество ответов в секунду
+    """
+    count: int = 0
+    started: float = time.perf_counter()
+    deadline: float = started + DURATION
+
+    while time.perf_counter() < deadline:
+        await run()
+        count += 1
+
+    return count / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    tweets: List[SimpleNamespace] = make_tweets(FEED_TWEETS)
+    profile: UserProfile = make_profile(USER_FOLLOWS)
+
+    def build_feed() -> BaseModel:
+        return build_get_tweets_response(tweets, FEED_TWEETS)  # type: ignore
+
+    def build_user() -> BaseModel:
+        return build_get_user_response(profile, FOLLOW_PAGE_SIZE)
+
+    for name, schema, build in (
+        ("feed", TweetsOut, build_feed),
+        ("user profile", UserOut, build_user),
+    ):
+        before: float = await measure(previous_path(schema, build))
+        after: float = await measure(current_path(build))
+        print(
+            f"{name}: before {before:.0f} rps, after {after:.0f} rps, "
+            f"x{after / before:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
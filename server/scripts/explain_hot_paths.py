@@ -0,0 +1,158 @@
+"""
+Проверка планов горячих запросов сервиса на синтетических данных.
+
+Наполняет базу внутри транзакции, выполняет EXPLAIN для каждого запроса
+и откатывает транзакцию. Завершается с кодом 1, если запрос не использует
+ожидаемый индекс.
+
+Запуск из каталога server: python -m scripts.explain_hot_paths
+"""
+
+import asyncio
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.database import engine
+from scripts.seed import seed_dataset
+
+# (описание, SQL, индекс, который должен быть в плане)
+HOT_PATHS: List[Tuple[str, str, str]] = [
+    (
+        "feed page",
+        "SELECT * FROM tweet ORDER BY like_count DESC, id DESC LIMIT 51",
+        "ix_tweet_like_count_id",
+    ),
+    (
+        "feed likes",
+        "SELECT * FROM tweet_like WHERE tweet_id IN (:tweet_id, :tweet_id - 1)",
+        "ix_tweet_like_tweet_id",
+    ),
+    (
+        "feed attachments",
+        "SELECT * FROM media WHERE tweet_id IN (:tweet_id, :tweet_id - 3)",
+        "ix_media_tweet_id",
+    ),
+    (
+        "user followers",
+        "SELECT * FROM follower WHERE following_id = :user_id "
+        "ORDER BY id DESC LIMIT 51",
+        "ix_follower_following_id_id",
+    ),
+    (
+        "user following",
+        "SELECT * FROM follower WHERE follower_api_key = :api_key "
+        "ORDER BY id DESC LIMIT 51",
+        "ix_follower_follower_api_key_id",
+    ),
+    (
+        "author tweets",
+        "SELECT id FROM tweet WHERE author_api_key = :api_key",
+        "ix_tweet_author_api_key",
+    ),
+    (
+        "timeline page",
+        "SELECT * FROM timeline_entry WHERE user_id = :user_id "
+        "ORDER BY score DESC, tweet_id DESC LIMIT 51",
+        "ix_timeline_entry_user_id_score_tweet_id",
+    ),
+    (
+        "tweet search",
+        "SELECT id FROM tweet "
+        "WHERE content_tsv @@ websearch_to_tsquery('simple', 'zebra')",
+        "ix_tweet_content_tsv",
+    ),
+    (
+        "timeline cascade delete",
+        "SELECT id FROM timeline_entry WHERE tweet_id = :tweet_id",
+        "ix_timeline_entry_tweet_id",
+    ),
+]
+
+
+def collect_index_names(plan: Dict[str, Any]) -> List[str]:
+    """
+    Функция сбора имен индексов из узлов плана
+    :param plan: Узел плана EXPLAIN (FORMAT JSON)
+    :return: Список имен индексов
+    """
+    names: List[str] = []
+    if "Index Name" in plan:
+        names.append(plan["Index Name"])
+
+    for child in plan.get("Plans", []):
+        names.extend(collect_index_names(child))
+
+    return names
+
+
+async def explain(
+    conn: AsyncConnection,
+    sql: str,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Функция получения плана запроса
+    :param conn: Соединение
+    :param sql: Текст запроса
+    :param params: Параметры запроса
+    :return: Корневой узел плана
+    """
+    result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return plan[0]["Plan"]
+
+
+async def main() -> int:
+    failed: int = 0
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        await seed_dataset(
+            conn,
+            users=10_000,
+            tweets=100_000,
+            likes=300_000,
+            follows=50_000,
+        )
+
+        params: Dict[str, Any] = dict(
+            (
+                await conn.execute(
+                    text(
+                        """
+                        SELECT
+                            (SELECT max(id) FROM tweet) AS tweet_id,
+                            (SELECT following_id FROM follower
+                             ORDER BY id DESC LIMIT 1) AS user_id,
+                            'seed-1' AS api_key
+                        """
+                    )
+                )
+            )
+            .mappings()
+            .one()
+        )
+
+        for name, sql, index in HOT_PATHS:
+            plan: Dict[str, Any] = await explain(conn, sql, params)
+            used: List[str] = collect_index_names(plan)
+            status: str = "ok" if index in used else "FAIL"
+            if index not in used:
+                failed += 1
+            print(f"[{status}] {name}: {plan['Node Type']}, indexes={used}")
+
+        await transaction.rollback()
+
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,120 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+WORDS: str = (
+    "'hello','world','python','postgres','fastapi','twitter','index','cache',"
+    "'feed','like','follow','photo','music','coffee','weekend','news','sport',"
+    "'travel','code','release','bug','deploy','summer','winter','cat','dog'"
+)
+
+
+async def seed_dataset(
+    conn: AsyncConnection,
+    users: int,
+    tweets: int,
+    likes: int,
+    follows: int,
+) -> None:
+    """
+    Функция наполнения базы синтетическими данными средствами generate_series.
+    Вызывается внутри транзакции, которую вызывающий код откатывает
+    :param conn: Соединение с открытой транзакцией
+    :param users: Количество юзеров
+    :param tweets: Количество твитов
+    :param likes: Количество лайков (дубликаты отбрасываются)
+    :param follows: Количество подписок (дубликаты отбрасываются)
+    """
+    await conn.execute(
+        text(
+            """
+            INSERT INTO "user" (api_key, name)
+            SELECT 'seed-' || n, 'Seed user ' || n
+            FROM generate_series(1, :users) AS n
+            """
+        ),
+        {"users": users},
+    )
+    await conn.execute(
+        text(
+            f"""
+            INSERT INTO tweet (content, author_api_key)
+            SELECT
+                array_to_string(ARRAY(
+                    SELECT (ARRAY[{WORDS}])[1 + floor(random() * 26)::int]
+                    FROM generate_series(1, 8 + (n % 5))
+                ), ' '),
+                'seed-' || (1 + floor(random() * :users)::int)
+            FROM generate_series(1, :tweets) AS n
+            """
+        ),
+        {"users": users, "tweets": tweets},
+    )
+    await conn.execute(
+        text(
+            """
+            INSERT INTO tweet_like (user_api_key, tweet_id)
+            SELECT
+                'seed-' || (1 + floor(random() * :users)::int),
+                t.max_id - floor(random() * :tweets)::int
+            FROM generate_series(1, :likes), (SELECT max(id) AS max_id FROM tweet) t
+            ON CONFLICT DO NOTHING
+            """
+        ),
+        {"users": users, "tweets": tweets, "likes": likes},
+    )
+    await conn.execute(
+        text(
+            """
+            UPDATE tweet
+            SET like_count = likes.count
+            FROM (
+                SELECT tweet_id, count(*) AS count
+                FROM tweet_like
+                GROUP BY tweet_id
+            ) AS likes
+            WHERE tweet.id = likes.tweet_id
+            """
+        )
+    )
+    await conn.execute(
+        text(
+            """
+            INSERT INTO follower (follower_api_key, following_id)
+            SELECT
+                'seed-' || (1 + floor(random() * :users)::int),
+                u.min_id + floor(random() * :users)::int
+            FROM
+                generate_series(1, :follows),
+                (SELECT min(id) AS min_id FROM "user" WHERE api_key = 'seed-1') u
+            ON CONFLICT DO NOTHING
+            """
+        ),
+        {"users": users, "follows": follows},
+    )
+    await conn.execute(
+        text(
+            """
+            INSERT INTO timeline_entry (user_id, tweet_id, score)
+            SELECT subscriber.id, tweet.id, tweet.id
+            FROM tweet
+            JOIN "user" author ON author.api_key = tweet.author_api_key
+            JOIN follower ON follower.following_id = author.id
+            JOIN "user" subscriber ON subscriber.api_key = follower.follower_api_key
+            WHERE tweet.author_api_key LIKE 'seed-%'
+            ON CONFLICT DO NOTHING
+            """
+        )
+    )
+    await conn.execute(
+        text(
+            """
+            INSERT INTO media (filename, content_type, tweet_id, uploader_api_key)
+            SELECT 'seed.png', 'image/png', id, author_api_key
+            FROM tweet
+            WHERE author_api_key LIKE 'seed-%' AND id % 3 = 0
+            """
+        )
+    )
+
+    for table in ("user", "tweet", "tweet_like", "follower", "timeline_entry", "media"):
+        await conn.execute(text(f'ANALYZE "{table}"'))
@@ -0,0 +1,191 @@
+import time
+from collections import OrderedDict
+from typing import (
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from src.config import (
+    API_KEY_CACHE_SIZE,
+    API_KEY_CACHE_TTL,
+    FEED_CACHE_SIZE,
+    FEED_CACHE_TTL,
+    MEDIA_CACHE_SIZE,
+    MEDIA_CACHE_TTL,
+    MEDIA_VARIANT_SIZES,
+)
+from .variants import VARIANT_CONTENT_TYPES
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Ограниченный по размеру LRU-кэш процесса со временем жизни записей
+    и счетчиками попаданий и промахов. Поколение увеличивается при полной
+    инвалидации и инвалидации по ключу: значение, прочитанное из базы
+    до такой инвалидации, не сохраняется. Удаление записей старше заданного
+    возраста поколение не меняет: значение, прочитанное во время такой записи,
+    отстает не больше допустимого
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self.generation: int = 0
+        self._data: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        """
+        Метод получения значения по ключу
+        :param key: Ключ
+        :return: Значение или None, если записи нет или она устарела
+        """
+        item: Tuple[float, V] | None = self._data.get(key)
+
+        if item is None or time.monotonic() - item[0] > self.ttl:
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: K, value: V, generation: int | None = None) -> None:
+        """
+        Метод сохранения значения с вытеснением самой старой записи
+        при переполнении
+        :param key: Ключ
+        :param value: Значение
+        :param generation: Поколение кэша до чтения значения из базы.
+        Если с тех пор кэш инвалидировался, значение не сохраняется
+        """
+        if generation is not None and generation != self.generation:
+            return
+
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """
+        Метод удаления записи по ключу
+        :param key: Ключ
+        """
+        self.generation += 1
+        self._data.pop(key, None)
+
+    def evict_older_than(self, age: float) -> None:
+        """
+        Метод удаления записей, сохраненных раньше заданного возраста
+        :param age: Возраст записи в секундах
+        """
+        now: float = time.monotonic()
+        stale: List[K] = [
+            key for key, (stored_at, _) in self._data.items() if now - stored_at > age
+        ]
+
+        for key in stale:
+            del self._data[key]
+
+    def clear(self) -> None:
+        """Метод удаления всех записей"""
+        self.generation += 1
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Метод получения статистики кэша
+        :return: Словарь с размером, попаданиями, промахами и долей попаданий
+        """
+        total: int = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+api_key_cache: TTLCache[str, int] = TTLCache(
+    maxsize=API_KEY_CACHE_SIZE,
+    ttl=API_KEY_CACHE_TTL,
+)
+
+# (курсор, размер страницы) -> сериализованная страница ленты
+feed_cache: TTLCache[Tuple[str | None, int], bytes] = TTLCache(
+    maxsize=FEED_CACHE_SIZE,
+    ttl=FEED_CACHE_TTL,
+)
+
+# (id файла, размер копии, формат копии) -> (путь, тип контента, ETag).
+# Для оригинала размер и формат равны None
+media_cache: TTLCache[Tuple[int, int | None, str | None], Tuple[str, str, str]] = (
+    TTLCache(maxsize=MEDIA_CACHE_SIZE, ttl=MEDIA_CACHE_TTL)
+)
+
+
+def evict_media(media_ids: Iterable[int]) -> None:
+    """
+    Функция удаления из кэша оригиналов и всех уменьшенных копий файлов
+    :param media_ids: id удаленных файлов
+    """
+    for media_id in media_ids:
+        media_cache.pop((media_id, None, None))
+
+        for size in MEDIA_VARIANT_SIZES:
+            for fmt in VARIANT_CONTENT_TYPES:
+                media_cache.pop((media_id, size, fmt))
+
+
+# Реестр кэшей процесса для инвалидации по имени из уведомлений других воркеров
+CACHES: Dict[str, TTLCache] = {
+    "api_key": api_key_cache,
+    "feed": feed_cache,
+    "media": media_cache,
+}
+
+
+def invalidate(
+    cache: str,
+    keys: Sequence[Hashable] | None = None,
+    older_than: float | None = None,
+) -> None:
+    """
+    Функция инвалидации кэша по имени: удаляются переданные ключи,
+    записи старше заданного возраста или, если ничего не передано, все записи
+    :param cache: Имя кэша из CACHES
+    :param keys: Ключи для удаления (для media - id файлов)
+    :param older_than: Возраст записей для удаления в секундах
+    """
+    if keys is not None and cache == "media":
+        evict_media(keys)  # type: ignore[arg-type]
+    elif keys is not None:
+        for key in keys:
+            CACHES[cache].pop(key)
+    elif older_than is not None:
+        CACHES[cache].evict_older_than(older_than)
+    else:
+        CACHES[cache].clear()
+
+
+def flush_caches() -> None:
+    """Функция очистки всех кэшей процесса"""
+    for cache in CACHES.values():
+        cache.clear()
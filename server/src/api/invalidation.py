@@ -0,0 +1,280 @@
+import asyncio
+import json
+import os
+import socket
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+import asyncpg
+from sqlalchemy import Function, Select, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import (
+    DB_USER,
+    DB_PASS,
+    DB_HOST,
+    DB_PORT,
+    DB_NAME,
+    INVALIDATION_CHANNEL,
+    INVALIDATION_KEEPALIVE,
+    INVALIDATION_RECONNECT_DELAY,
+)
+from .cache import flush_caches, invalidate
+
+LISTEN_DSN: str = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+PENDING_KEY: str = "pending_messages"
+MAX_RECONNECT_DELAY: float = 30
+# Payload NOTIFY должен быть короче 8000 байт
+NOTIFY_MAX_BYTES: int = 7999
+# Отправитель уведомления: свои уведомления уже применены после коммита.
+# pid из уведомления Postgres - это pid серверного процесса, а не воркера
+SENDER_ID: str = f"{socket.gethostname()}:{os.getpid()}"
+# Обработчики каналов уведомлений: сообщение применяется в своем процессе
+# после коммита и в других воркерах по уведомлению
+CHANNEL_HANDLERS: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+# Обработчики нераспознанных сообщений по каналам
+ERROR_HANDLERS: Dict[str, Callable[[], None]] = {}
+
+
+def build_invalidation(
+    cache: str,
+    keys: Sequence[Hashable] | None = None,
+    older_than: float | None = None,
+) -> Dict[str, Any]:
+    """
+    Функция построения сообщения об инвалидации кэша
+    :param cache: Имя кэша из CACHES
+    :param keys: Ключи для удаления (для media - id файлов)
+    :param older_than: Возраст записей для удаления в секундах
+    :return: Сообщение
+    """
+    return {
+        "cache": cache,
+        "keys": list(keys) if keys is not None else None,
+        "older_than": older_than,
+        "sender": SENDER_ID,
+    }
+
+
+def register_channel(
+    channel: str,
+    apply: Callable[[Dict[str, Any]], None],
+    on_error: Callable[[], None] | None = None,
+) -> None:
+    """
+    Функция регистрации канала уведомлений
+    :param channel: Канал
+    :param apply: Функция применения сообщения
+    :param on_error: Функция, вызываемая при нераспознанном сообщении
+    """
+    CHANNEL_HANDLERS[channel] = apply
+    if on_error is not None:
+        ERROR_HANDLERS[channel] = on_error
+
+
+def encode_message(message: Any) -> str:
+    """
+    Функция кодирования сообщения или его части в payload уведомления.
+    Не-ASCII символы экранируются, поэтому длина строки равна длине в байтах
+    :param message: Сообщение
+    :return: JSON-строка
+    """
+    return json.dumps(message, separators=(",", ":"))
+
+
+def notify_message(channel: str, message: Dict[str, Any]) -> Function:
+    """
+    Функция построения SQL-выражения NOTIFY для встраивания в запрос записи,
+    чтобы уведомление не требовало отдельного обращения к базе
+    :param channel: Канал
+    :param message: Сообщение
+    :return: Выражение pg_notify
+    """
+    return func.pg_notify(channel, encode_message(message))
+
+
+def queue_message(
+    session: AsyncSession,
+    channel: str,
+    message: Dict[str, Any],
+) -> None:
+    """
+    Функция постановки сообщения для применения в своем процессе
+    после коммита сессии
+    :param session: AsyncSession
+    :param channel: Канал
+    :param message: Сообщение
+    """
+    session.info.setdefault(PENDING_KEY, []).append((channel, message))
+
+
+async def publish_messages(
+    session: AsyncSession,
+    channel: str,
+    messages: Sequence[Dict[str, Any]],
+) -> None:
+    """
+    Функция публикации сообщений в текущей транзакции одним запросом.
+    Postgres доставляет NOTIFY другим воркерам только после COMMIT,
+    откат транзакции отменяет уведомление. В своем процессе сообщения
+    применяются после коммита сессии
+    :param session: AsyncSession
+    :param channel: Канал
+    :param messages: Сообщения
+    """
+    stmt: Select = select(*(notify_message(channel, message) for message in messages))
+    await session.execute(stmt)
+
+    for message in messages:
+        queue_message(session, channel, message)
+
+
+async def publish_invalidation(
+    session: AsyncSession,
+    cache: str,
+    keys: Sequence[Hashable] | None = None,
+    older_than: float | None = None,
+) -> None:
+    """
+    Функция публикации инвалидации кэша в текущей транзакции
+    :param session: AsyncSession
+    :param cache: Имя кэша из CACHES
+    :param keys: Ключи для удаления (для media - id файлов)
+    :param older_than: Возраст записей для удаления в секундах
+    """
+    message: Dict[str, Any] = build_invalidation(cache, keys, older_than)
+    await publish_messages(session, INVALIDATION_CHANNEL, [message])
+
+
+def apply_invalidation(message: Dict[str, Any]) -> None:
+    """
+    Функция применения сообщения об инвалидации к кэшам процесса
+    :param message: Сообщение об инвалидации
+    """
+    invalidate(message["cache"], message["keys"], message["older_than"])
+
+
+@event.listens_for(Session, "after_commit")
+def apply_pending_messages(session: Session) -> None:
+    """
+    Обработчик коммита сессии: применение сообщений в своем процессе
+    :param session: Session
+    """
+    pending: List[Tuple[str, Dict[str, Any]]] = session.info.pop(PENDING_KEY, [])
+
+    for channel, message in pending:
+        CHANNEL_HANDLERS[channel](message)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_pending_messages(session: Session) -> None:
+    """
+    Обработчик отката сессии: отмена неопубликованных сообщений
+    :param session: Session
+    """
+    session.info.pop(PENDING_KEY, None)
+
+
+def handle_notification(
+    connection: asyncpg.Connection,
+    pid: int,
+    channel: str,
+    payload: str,
+) -> None:
+    """
+    Обработчик уведомления от другого воркера. Уведомления своего воркера
+    пропускаются. При нераспознанном сообщении вызывается обработчик
+    ошибок канала (для инвалидации - полная очистка кэшей)
+    :param connection: Соединение слушателя
+    :param pid: pid процесса Postgres отправителя
+    :param channel: Канал
+    :param payload: JSON-сообщение
+    """
+    try:
+        message: Dict[str, Any] = json.loads(payload)
+        if message.get("sender") == SENDER_ID:
+            return
+
+        CHANNEL_HANDLERS[channel](message)
+    except (ValueError, KeyError, TypeError):
+        on_error: Callable[[], None] | None = ERROR_HANDLERS.get(channel)
+        if on_error is not None:
+            on_error()
+
+
+class InvalidationListener:
+    """
+    Слушатель зарегистрированных каналов уведомлений на выделенном
+    соединении asyncpg. После каждого (пере)подключения кэши процесса
+    очищаются полностью, так как уведомления, отправленные без слушателя,
+    теряются
+    """
+
+    def __init__(self, dsn: str = LISTEN_DSN) -> None:
+        self.dsn: str = dsn
+        self.connected: asyncio.Event = asyncio.Event()
+        self.reconnects: int = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Метод запуска слушателя в фоновой задаче"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Метод остановки слушателя"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Метод получения статистики слушателя
+        :return: Словарь с признаком подключения и числом переподключений
+        """
+        return {
+            "connected": int(self.connected.is_set()),
+            "reconnects": self.reconnects,
+        }
+
+    async def _run(self) -> None:
+        """
+        Метод цикла слушателя: подключение, подписка на каналы
+        и периодическая проверка соединения с переподключением при обрыве
+        """
+        delay: float = INVALIDATION_RECONNECT_DELAY
+
+        while True:
+            try:
+                connection: asyncpg.Connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                continue
+
+            try:
+                for channel in CHANNEL_HANDLERS:
+                    await connection.add_listener(channel, handle_notification)
+                flush_caches()
+                self.connected.set()
+                delay = INVALIDATION_RECONNECT_DELAY
+
+                while True:
+                    await asyncio.sleep(INVALIDATION_KEEPALIVE)
+                    await connection.execute("SELECT 1")
+
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                self.reconnects += 1
+
+            finally:
+                self.connected.clear()
+                connection.terminate()
+
+
+register_channel(INVALIDATION_CHANNEL, apply_invalidation, on_error=flush_caches)
+
+invalidation_listener: InvalidationListener = InvalidationListener()
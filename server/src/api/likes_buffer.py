@@ -0,0 +1,210 @@
+import asyncio
+import logging
+from typing import Dict, List, Tuple
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from src.config import LIKE_BUFFER_INTERVAL, LIKE_BUFFER_MAX_ITEMS
+from src.database import async_session
+from .service import apply_like_toggles
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Функция проверки, что ошибка записи временная (обрыв или недоступность
+    соединения) и запись стоит повторить
+    :param error: Исключение
+    :return: Логический результат
+    """
+    if isinstance(error, (OSError, TimeoutError, InterfaceError, OperationalError)):
+        return True
+
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class LikeBuffer:
+    """
+    Буфер отложенной записи лайков. Переключения одной пары (юзер, твит)
+    схлопываются в итоговое состояние, буфер сбрасывается в базу пакетом
+    раз в LIKE_BUFFER_INTERVAL секунд или при накоплении LIKE_BUFFER_MAX_ITEMS пар.
+    При временной ошибке пакет остается в буфере, при любой другой пары
+    записываются по одной, а не записавшиеся отбрасываются
+    """
+
+    def __init__(self, interval: float, max_items: int) -> None:
+        self.interval: float = interval
+        self.max_items: int = max_items
+        self.coalesced: int = 0
+        self.flushed: int = 0
+        self.batches: int = 0
+        self.dropped: int = 0
+        self._pending: Dict[Tuple[str, int], bool] = {}
+        self._pending_users: Dict[str, int] = {}
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._lock: asyncio.Lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def add(self, api_key: str, tweet_id: int, liked: bool) -> None:
+        """
+        Метод добавления лайка или его отмены в буфер
+        :param api_key: api-key юзера
+        :param tweet_id: id твита
+        :param liked: True - лайк, False - отмена лайка
+        """
+        key: Tuple[str, int] = (api_key, tweet_id)
+        if key in self._pending:
+            self.coalesced += 1
+        else:
+            self._pending_users[api_key] = self._pending_users.get(api_key, 0) + 1
+
+        self._pending[key] = liked
+
+        if len(self._pending) >= self.max_items:
+            self._wakeup.set()
+
+    def has_pending(self, api_key: str | None) -> bool:
+        """
+        Метод проверки наличия в буфере лайков юзера
+        :param api_key: api-key юзера
+        :return: Логический результат
+        """
+        return api_key in self._pending_users
+
+    async def flush(self) -> None:
+        """
+        Метод сброса буфера в базу. При временной ошибке пары возвращаются
+        в буфер, более новые переключения тех же пар сохраняются
+        """
+        async with self._lock:
+            batch: Dict[Tuple[str, int], bool] = self._pending
+            self._pending = {}
+            self._pending_users = {}
+
+            if not batch:
+                return
+
+            try:
+                async with async_session() as session:
+                    await apply_like_toggles(session, batch)
+            except Exception as error:
+                if is_transient_error(error):
+                    self._restore(batch)
+                    raise
+
+                logger.exception("Like buffer batch failed, writing pairs one by one")
+                await self._flush_each(batch)
+                return
+
+            self.flushed += len(batch)
+            self.batches += 1
+
+    async def flush_for(self, api_key: str | None) -> bool:
+        """
+        Метод сброса буфера перед чтением, если в нем есть лайки юзера,
+        чтобы юзер видел свои лайки
+        :param api_key: api-key юзера
+        :return: True, если буфер был сброшен. При ошибке записи чтение
+        выполняется без сброса, пары остаются в буфере
+        """
+        if not self.has_pending(api_key):
+            return False
+
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Like buffer flush before read failed")
+            return False
+
+        return True
+
+    def start(self) -> None:
+        """Метод запуска периодического сброса в фоновой задаче"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Метод остановки периодического сброса с финальным сбросом буфера"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Метод получения статистики буфера
+        :return: Словарь с числом ожидающих, схлопнутых, записанных
+        и отброшенных пар и числом пакетов
+        """
+        return {
+            "pending": len(self._pending),
+            "coalesced": self.coalesced,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "batches": self.batches,
+        }
+
+    async def _flush_each(self, batch: Dict[Tuple[str, int], bool]) -> None:
+        """
+        Метод записи пар по одной после ошибки пакета. Пары с невременной
+        ошибкой отбрасываются, при временной ошибке оставшиеся пары
+        возвращаются в буфер
+        :param batch: Пакет пар
+        """
+        pairs: List[Tuple[Tuple[str, int], bool]] = list(batch.items())
+
+        for index, (key, liked) in enumerate(pairs):
+            try:
+                async with async_session() as session:
+                    await apply_like_toggles(session, {key: liked})
+            except Exception as error:
+                if is_transient_error(error):
+                    self._restore(dict(pairs[index:]))
+                    raise
+
+                self.dropped += 1
+                logger.error("Like buffer dropped pair %s: %s", key, error)
+                continue
+
+            self.flushed += 1
+            self.batches += 1
+
+    def _restore(self, batch: Dict[Tuple[str, int], bool]) -> None:
+        """
+        Метод возврата пар в буфер после временной ошибки. Более новые
+        переключения тех же пар сохраняются
+        :param batch: Пакет пар
+        """
+        self._pending = {**batch, **self._pending}
+        self._pending_users = {}
+
+        for api_key, _ in self._pending:
+            self._pending_users[api_key] = self._pending_users.get(api_key, 0) + 1
+
+    async def _run(self) -> None:
+        """Метод цикла периодического сброса буфера"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                # Пары уже возвращены в буфер, повтор на следующем цикле
+                pass
+
+
+like_buffer: LikeBuffer = LikeBuffer(
+    interval=LIKE_BUFFER_INTERVAL,
+    max_items=LIKE_BUFFER_MAX_ITEMS,
+)
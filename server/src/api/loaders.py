@@ -0,0 +1,28 @@
+from typing import Dict, Tuple
+
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.sql.base import ExecutableOption
+
+from .models import Tweet, TweetLike
+
+# Все связи моделей по умолчанию lazy="raise": функция сервиса, загружающая
+# объекты со связями, явно выбирает профиль загрузки под свой сценарий.
+# Остальные чтения выбирают только нужные колонки
+LOADER_PROFILES: Dict[str, Tuple[ExecutableOption, ...]] = {
+    # Твит для ленты: файлы, автор и лайки с юзерами
+    "feed": (
+        selectinload(Tweet.attachments),
+        joinedload(Tweet.author),
+        selectinload(Tweet.likes).joinedload(TweetLike.user),
+        raiseload("*"),
+    ),
+}
+
+
+def loader_profile(name: str) -> Tuple[ExecutableOption, ...]:
+    """
+    Функция получения опций загрузки связей по имени профиля
+    :param name: Имя профиля (feed)
+    :return: Кортеж опций для Select.options
+    """
+    return LOADER_PROFILES[name]
@@ -1,9 +1,14 @@
 from typing import List
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import Computed, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship
 
+# Конфигурация полнотекстового поиска: без стемминга и стоп-слов,
+# так как язык твитов заранее неизвестен
+SEARCH_CONFIG: str = "simple"
+
 
 class Base(AsyncAttrs, DeclarativeBase):
     """Базовая таблица с id"""
@@ -15,6 +20,19 @@ class Base(AsyncAttrs, DeclarativeBase):
     )
 
 
+class MediaBlob(Base):
+    """
+    Таблица для хранения содержимого файла, адресуемого по SHA-256.
+    ref_count - количество объектов Media, ссылающихся на файл
+    """
+
+    __tablename__ = "media_blob"
+
+    sha256: Mapped[str] = mapped_column(unique=True)
+    size: Mapped[int]
+    ref_count: Mapped[int] = mapped_column(default=1)
+
+
 class Media(Base):
     """Таблица для хранения имени и типа файла"""
 
@@ -22,13 +40,24 @@ class Media(Base):
 
     filename: Mapped[str]
     content_type: Mapped[str]
+    sha256: Mapped[str] = mapped_column(
+        ForeignKey("media_blob.sha256"),
+        nullable=True,
+        index=True,
+    )
+
+    uploader_api_key: Mapped[str] = mapped_column(
+        ForeignKey("user.api_key", ondelete="CASCADE"),
+        nullable=True,
+    )
 
     tweet_id: Mapped[int] = mapped_column(
         ForeignKey("tweet.id", ondelete="CASCADE"),
         nullable=True,
+        index=True,
     )
     tweet: Mapped["Tweet"] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="attachments",
     )
 
@@ -45,15 +74,16 @@ class TweetLike(Base):
     tweet_id: Mapped[int] = mapped_column(
         ForeignKey("tweet.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
 
     user: Mapped["User"] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="liked_tweets",
         foreign_keys=[user_api_key],
     )
     tweet: Mapped["Tweet"] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="likes",
         foreign_keys=[tweet_id],
     )
@@ -73,17 +103,38 @@ class Tweet(Base):
     __tablename__ = "tweet"
 
     content: Mapped[str]
+    like_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Вычисляется Postgres при записи, ORM-запросы твитов его не загружают
+    content_tsv: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', content)", persisted=True),
+        deferred=True,
+        deferred_raiseload=True,
+    )
     attachments: Mapped[List["Media"]] = relationship(
+        lazy="raise",
         back_populates="tweet",
     )
 
-    author_api_key: Mapped[str] = mapped_column(ForeignKey("user.api_key"))
-    author: Mapped["User"] = relationship(back_populates="tweets")
+    author_api_key: Mapped[str] = mapped_column(
+        ForeignKey("user.api_key"),
+        index=True,
+    )
+    author: Mapped["User"] = relationship(
+        lazy="raise",
+        back_populates="tweets",
+    )
 
     likes: Mapped[List["TweetLike"]] = relationship(
+        lazy="raise",
         back_populates="tweet",
     )
 
+    __table_args__ = (
+        Index("ix_tweet_like_count_id", "like_count", "id"),
+        Index("ix_tweet_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
+
 
 class Follower(Base):
     """Таблица для хранения подписчиков, подписок"""
@@ -100,13 +151,13 @@ class Follower(Base):
     )
 
     follower: Mapped["User"] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="followers",
         foreign_keys=[follower_api_key],
         overlaps="following",
     )
     following: Mapped["User"] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="following",
         foreign_keys=[following_id],
         overlaps="following",
@@ -118,6 +169,108 @@ class Follower(Base):
             "following_id",
             name="uq_follower_api_key_following_id",
         ),
+        # Keyset-пагинация списков подписчиков и подписок по id связи
+        Index("ix_follower_following_id_id", "following_id", "id"),
+        Index("ix_follower_follower_api_key_id", "follower_api_key", "id"),
+    )
+
+
+class TimelineEntry(Base):
+    """
+    Таблица для хранения материализованной ленты подписок пользователя.
+    score - ключ сортировки ленты (id твита, монотонно возрастает)
+    """
+
+    __tablename__ = "timeline_entry"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    tweet_id: Mapped[int] = mapped_column(
+        ForeignKey("tweet.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    score: Mapped[int]
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "tweet_id",
+            name="uq_timeline_entry_user_id_tweet_id",
+        ),
+        Index(
+            "ix_timeline_entry_user_id_score_tweet_id",
+            "user_id",
+            "score",
+            "tweet_id",
+        ),
+    )
+
+
+class Hashtag(Base):
+    """Таблица для хранения хэштега в нижнем регистре без #"""
+
+    __tablename__ = "hashtag"
+
+    tag: Mapped[str] = mapped_column(unique=True)
+
+
+class TweetHashtag(Base):
+    """Таблица связи твита с хэштегом"""
+
+    __tablename__ = "tweet_hashtag"
+
+    tweet_id: Mapped[int] = mapped_column(
+        ForeignKey("tweet.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    hashtag_id: Mapped[int] = mapped_column(
+        ForeignKey("hashtag.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # Также служит индексом keyset-пагинации твитов хэштега по id твита
+        UniqueConstraint(
+            "hashtag_id",
+            "tweet_id",
+            name="uq_tweet_hashtag_hashtag_id_tweet_id",
+        ),
+    )
+
+
+class Mention(Base):
+    """Таблица для хранения упоминания в нижнем регистре без @"""
+
+    __tablename__ = "mention"
+
+    name: Mapped[str] = mapped_column(unique=True)
+
+
+class TweetMention(Base):
+    """Таблица связи твита с упоминанием"""
+
+    __tablename__ = "tweet_mention"
+
+    tweet_id: Mapped[int] = mapped_column(
+        ForeignKey("tweet.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    mention_id: Mapped[int] = mapped_column(
+        ForeignKey("mention.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "mention_id",
+            "tweet_id",
+            name="uq_tweet_mention_mention_id_tweet_id",
+        ),
     )
 
 
@@ -129,27 +282,27 @@ class User(Base):
     api_key: Mapped[str] = mapped_column(primary_key=True, unique=True)
     name: Mapped[str]
     tweets: Mapped[List["Tweet"]] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="author",
         cascade="all, delete-orphan",
     )
 
     followers: Mapped[List["Follower"]] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="follower",
         cascade="all, delete-orphan",
         foreign_keys=[Follower.following_id],
         overlaps="following",
     )
     following: Mapped[List["Follower"]] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="following",
         cascade="all, delete-orphan",
         foreign_keys=[Follower.follower_api_key],
         overlaps="following",
     )
     liked_tweets: Mapped[List["TweetLike"]] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="user",
         cascade="all, delete-orphan",
     )
@@ -1,11 +1,37 @@
-from typing import Sequence, Annotated
-
-from fastapi import APIRouter, Depends, Request, HTTPException, Path, UploadFile
-from fastapi.responses import FileResponse
+from typing import Awaitable, Callable, Sequence, Annotated, Literal, Tuple
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Request,
+    HTTPException,
+    Path,
+    Query,
+    UploadFile,
+)
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
+from src.config import (
+    FEED_PAGE_SIZE,
+    FEED_MAX_PAGE_SIZE,
+    FEED_SQL_JSON,
+    FOLLOW_PAGE_SIZE,
+    FOLLOW_MAX_PAGE_SIZE,
+    LIKE_BUFFER_ENABLED,
+    MEDIA_VARIANT_SIZES,
+    SEARCH_MAX_QUERY_LENGTH,
+)
+from src.database import get_async_session, get_pool_stats
+from .cache import api_key_cache, feed_cache, media_cache
+from .invalidation import invalidation_listener
+from .likes_buffer import like_buffer
+from .trending import trending
+from .singleflight import single_flight_group, without_single_flight
 from .models import User, Tweet, Media
+from .variants import VARIANT_DECODE_ERRORS, ensure_variant, generate_variants
 from .schemas import (
     UserOut,
     ResultBase,
@@ -15,11 +41,15 @@ from .schemas import (
     MediaOut,
     ErrorBase,
     UserIn,
+    MetricsOut,
+    FollowsOut,
+    TrendingOut,
 )
 from .service import (
     get_user_with_followers_and_following_by_api_key,
     delete_tweet_by_id,
     get_all_tweets,
+    get_all_tweets_json,
     like_by_tweet_id,
     delete_like_by_tweet_id,
     follow_by_user_id,
@@ -29,15 +59,35 @@ from .service import (
     create_media,
     get_media,
     create_user_by_schema,
+    fan_out_tweet,
+    get_timeline_tweets,
+    stream_tweets_json,
+    search_tweets_json,
+    get_hashtag_tweets_json,
+    get_followers_page,
+    get_following_page,
+    check_user_exists,
 )
 from .utils import (
     build_get_user_response,
     build_result_response,
     build_get_tweets_response,
+    build_get_tweets_json,
     build_create_tweet_response,
     build_error_response,
     build_create_media_response,
     build_get_media_response,
+    build_media_file_response,
+    decode_cursor,
+    search_sort_key,
+    hashtag_sort_key,
+    timeline_sort_key,
+    build_metrics_response,
+    build_json_response,
+    build_get_follows_response,
+    build_trending_response,
+    UserProfile,
+    ID_MAX,
 )
 
 router: APIRouter = APIRouter(
@@ -48,22 +98,21 @@ router: APIRouter = APIRouter(
 
 @router.post("/medias", response_model=MediaOut, status_code=201)
 async def create_medias(
+    request: Request,
     file: UploadFile,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_async_session),
-) -> MediaOut:
+) -> Response:
     """
-    Эндпоинт для загрузки файла
+    Эндпоинт для загрузки файла. Уменьшенные копии строятся в фоне после ответа
+    :param request: Запрос
     :param file: Загружаемый файл
+    :param background_tasks: Фоновые задачи
     :param session: AsyncSession
     :return: Схема MediaOut
     """
-    if file.content_type not in {"image/jpeg", "image/png"}:
-        raise HTTPException(
-            status_code=400,
-            detail="Media validation failed",
-        )
-
-    new_media: Media | None = await create_media(session, file)
+    api_key: str | None = request.headers.get("api-key")
+    new_media: Media | None = await create_media(session, file, api_key)
 
     if new_media is None:
         raise HTTPException(
@@ -71,31 +120,85 @@ async def create_medias(
             detail="Media validation failed",
         )
 
+    background_tasks.add_task(generate_variants, new_media.filename)
+
     response: MediaOut = build_create_media_response(new_media)
-    return response
+    return build_json_response(response, status_code=201)
 
 
 @router.get("/medias/{media_id}", response_model=None, status_code=200)
 async def get_medias(
-    media_id: int,
+    request: Request,
+    media_id: Annotated[int, Path(ge=1, le=ID_MAX)],
+    size: int | None = None,
+    fmt: Annotated[Literal["webp", "jpeg"], Query(alias="format")] = "jpeg",
     session: AsyncSession = Depends(get_async_session),
-) -> FileResponse:
+) -> Response:
     """
-    Эндпоинт для получения файла по id
+    Эндпоинт для получения файла по id.
+    Поддерживает If-None-Match и Range, путь файла кэшируется в памяти
+    :param request: Запрос
     :param media_id: id файла
+    :param size: Максимальная сторона уменьшенной копии из MEDIA_VARIANT_SIZES
+    :param fmt: Формат уменьшенной копии
     :param session: AsyncSession
-    :return: Файл
+    :return: Файл, его часть или 304
     """
-    media: Media | None = await get_media(session, media_id)
+    if size is not None and size not in MEDIA_VARIANT_SIZES:
+        raise HTTPException(
+            status_code=400,
+            detail="Unsupported media size",
+        )
 
-    if not media:
+    cache_key: Tuple[int, int | None, str | None] = (
+        media_id,
+        size,
+        fmt if size is not None else None,
+    )
+    cached: Tuple[str, str, str] | None = media_cache.get(cache_key)
+
+    if cached is None:
+        media: Row | None = await get_media(session, media_id)
+
+        if not media:
+            raise HTTPException(
+                status_code=404,
+                detail="Media not found",
+            )
+
+        if size is not None:
+            try:
+                await ensure_variant(media.filename, size, fmt)
+            except FileNotFoundError:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Media not found",
+                )
+            except VARIANT_DECODE_ERRORS:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Media can not be decoded",
+                )
+
+        cached = build_get_media_response(media, size, fmt)
+        media_cache.set(cache_key, cached)
+
+    file_path, content_type, etag = cached
+
+    try:
+        response: Response = await build_media_file_response(
+            request.headers,
+            file_path,
+            content_type,
+            etag,
+        )
+    except FileNotFoundError:
+        media_cache.pop(cache_key)
         raise HTTPException(
             status_code=404,
             detail="Media not found",
         )
 
-    file_path, content_type = build_get_media_response(media)
-    response: FileResponse = FileResponse(file_path, media_type=content_type)
     return response
 
 
@@ -103,12 +206,15 @@ async def get_medias(
 async def create_tweet(
     request: Request,
     tweet: TweetIn,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_async_session),
-) -> TweetOut:
+) -> Response:
     """
-    Эндпоинт
+    Эндпоинт для создания твита. Раскладка твита в ленты подписчиков
+    выполняется в фоне после ответа
     :param request: Запрос
     :param tweet: Схема TweetIn
+    :param background_tasks: Фоновые задачи
     :param session: AsyncSession
     :return: Схема TweetOut
     """
@@ -125,38 +231,185 @@ async def create_tweet(
             detail="Tweet validation failed",
         )
 
+    background_tasks.add_task(fan_out_tweet, new_tweet.id)
+
     response: TweetOut = build_create_tweet_response(tweet=new_tweet)
-    return response
+    return build_json_response(response, status_code=201)
 
 
 @router.get("/tweets", response_model=TweetsOut | ErrorBase, status_code=200)
 async def get_tweets(
+    request: Request,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=FEED_MAX_PAGE_SIZE)] = FEED_PAGE_SIZE,
     session: AsyncSession = Depends(get_async_session),
-) -> TweetsOut | ErrorBase:
+) -> Response:
     """
-    Эндпоинт для получения всех твитов
+    Эндпоинт для получения страницы твитов
+    :param request: Запрос
+    :param cursor: Курсор следующей страницы из предыдущего ответа
+    :param limit: Размер страницы
     :param session: AsyncSession
-    :return: Схема TweetsOut или ErrorBase
+    :return: JSON страницы по схеме TweetsOut или схема ErrorBase
     """
-    tweets: Sequence[Tweet] | None = await get_all_tweets(session)
-
-    if not tweets:
+    # Юзер с лайками в буфере должен видеть их сразу, минуя кэш,
+    # отстающий от лайков на FEED_CACHE_STALENESS
+    api_key: str | None = request.headers.get("api-key")
+    flushed: bool = await like_buffer.flush_for(api_key)
+
+    cached: bytes | None = None if flushed else feed_cache.get((cursor, limit))
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # Запись, зафиксированная во время чтения, инвалидирует кэш раньше,
+    # чем сюда вернется страница: такая страница не сохраняется
+    generation: int = feed_cache.generation
+
+    after: Tuple[int, ...] | None = None
+    if cursor is not None:
+        after = decode_cursor(cursor, 2)
+
+        if after is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor",
+            )
+
+    content: bytes | None = None
+    if FEED_SQL_JSON:
+        # После сброса буфера нельзя присоединиться к чтению, начатому
+        # до коммита лайков юзера
+        read_page: Callable[..., Awaitable[Sequence[Row]]] = (
+            without_single_flight(get_all_tweets_json)
+            if flushed
+            else get_all_tweets_json
+        )
+        rows: Sequence[Row] = await read_page(session, limit, after)
+        if rows or cursor is not None:
+            content = build_get_tweets_json(rows, limit)
+    else:
+        tweets: Sequence[Tweet] | None = await get_all_tweets(session, limit, after)
+        if tweets or cursor is not None:
+            response: TweetsOut = build_get_tweets_response(tweets or [], limit)
+            content = response.model_dump_json().encode()
+
+    if content is None:
         error_response: ErrorBase = build_error_response(
             "404",
             "There are no tweets yet",
         )
-        return error_response
+        return build_json_response(error_response)
+
+    feed_cache.set((cursor, limit), content, generation=generation)
+
+    return Response(content=content, media_type="application/json")
 
-    response: TweetsOut = build_get_tweets_response(tweets)
+
+@router.get("/tweets/export", response_model=None, status_code=200)
+async def export_tweets(
+    since_id: Annotated[int, Query(ge=0)] = 0,
+) -> StreamingResponse:
+    """
+    Эндпоинт для потоковой выгрузки всех твитов в формате NDJSON.
+    Для продолжения выгрузки передается id последнего полученного твита
+    :param since_id: id последнего уже полученного твита
+    :return: Поток строк JSON по схеме TweetBase в порядке возрастания id
+    """
+    response: StreamingResponse = StreamingResponse(
+        stream_tweets_json(since_id),
+        media_type="application/x-ndjson",
+    )
     return response
 
 
+@router.get("/tweets/search", response_model=TweetsOut, status_code=200)
+async def search_tweets(
+    q: Annotated[str, Query(min_length=1, max_length=SEARCH_MAX_QUERY_LENGTH)],
+    author_id: Annotated[int | None, Query(ge=1)] = None,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=FEED_MAX_PAGE_SIZE)] = FEED_PAGE_SIZE,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """
+    Эндпоинт для полнотекстового поиска твитов по содержимому
+    :param q: Поисковый запрос: слова, "фраза", or, -исключение
+    :param author_id: id автора для фильтрации
+    :param cursor: Курсор следующей страницы из предыдущего ответа
+    :param limit: Размер страницы
+    :param session: AsyncSession
+    :return: JSON страницы по схеме TweetsOut в порядке убывания релевантности
+    """
+    after: Tuple[float, int] | None = None
+    if cursor is not None:
+        after = decode_cursor(cursor, 2, (float, int))
+
+        if after is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor",
+            )
+
+    rows: Sequence[Row] = await search_tweets_json(
+        session,
+        q,
+        limit,
+        after,
+        author_id,
+    )
+    content: bytes = build_get_tweets_json(rows, limit, sort_key=search_sort_key)
+
+    return Response(content=content, media_type="application/json")
+
+
+@router.get("/timeline", response_model=TweetsOut, status_code=200)
+async def get_timeline(
+    request: Request,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=FEED_MAX_PAGE_SIZE)] = FEED_PAGE_SIZE,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """
+    Эндпоинт для получения страницы ленты подписок
+    :param request: Запрос
+    :param cursor: Курсор следующей страницы из предыдущего ответа
+    :param limit: Размер страницы
+    :param session: AsyncSession
+    :return: Схема TweetsOut
+    """
+    after: Tuple[int, ...] | None = None
+    if cursor is not None:
+        after = decode_cursor(cursor, 2)
+
+        if after is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor",
+            )
+
+    api_key: str | None = request.headers.get("api-key")
+    await like_buffer.flush_for(api_key)
+
+    tweets: Sequence[Tweet] = await get_timeline_tweets(
+        session,
+        api_key,
+        limit,
+        after,
+    )
+
+    response: TweetsOut = build_get_tweets_response(
+        tweets,
+        limit,
+        sort_key=timeline_sort_key,
+    )
+    return build_json_response(response)
+
+
 @router.delete("/tweets/{id}", response_model=ResultBase, status_code=200)
 async def delete_tweet(
     request: Request,
-    tweet_id: Annotated[int, Path(alias="id")],
+    tweet_id: Annotated[int, Path(alias="id", ge=1, le=ID_MAX)],
     session: AsyncSession = Depends(get_async_session),
-) -> ResultBase:
+) -> Response:
     """
     Эндпоинт для удаления твита по id
     :param request: Запрос
@@ -178,15 +431,15 @@ async def delete_tweet(
         )
 
     response: ResultBase = build_result_response(True)
-    return response
+    return build_json_response(response)
 
 
 @router.post("/tweets/{id}/likes", response_model=ResultBase, status_code=201)
 async def like_tweet(
     request: Request,
-    tweet_id: Annotated[int, Path(alias="id")],
+    tweet_id: Annotated[int, Path(alias="id", ge=1, le=ID_MAX)],
     session: AsyncSession = Depends(get_async_session),
-) -> ResultBase:
+) -> Response:
     """
     Эндпоинт для добавления твита в понравившиеся
     :param request: Запрос
@@ -195,7 +448,14 @@ async def like_tweet(
     :return: Схема ResultBase
     """
     api_key: str | None = request.headers.get("api-key")
-    check_tweet_like: bool = await like_by_tweet_id(session, tweet_id, api_key)
+
+    check_tweet_like: bool
+    if LIKE_BUFFER_ENABLED and api_key is not None:
+        # Несуществующие твиты отбрасываются при сбросе буфера
+        like_buffer.add(api_key, tweet_id, True)
+        check_tweet_like = True
+    else:
+        check_tweet_like = await like_by_tweet_id(session, tweet_id, api_key)
 
     if not check_tweet_like:
         raise HTTPException(
@@ -204,15 +464,15 @@ async def like_tweet(
         )
 
     response: ResultBase = build_result_response(True)
-    return response
+    return build_json_response(response, status_code=201)
 
 
 @router.delete("/tweets/{id}/likes", response_model=ResultBase, status_code=200)
 async def delete_like_tweet(
     request: Request,
-    tweet_id: Annotated[int, Path(alias="id")],
+    tweet_id: Annotated[int, Path(alias="id", ge=1, le=ID_MAX)],
     session: AsyncSession = Depends(get_async_session),
-) -> ResultBase:
+) -> Response:
     """
     Эндпоинт для удаления твита из понравившихся
     :param request: Запрос
@@ -221,11 +481,17 @@ async def delete_like_tweet(
     :return: Схема ResultBase
     """
     api_key: str | None = request.headers.get("api-key")
-    check_tweet_like: bool = await delete_like_by_tweet_id(
-        session,
-        tweet_id,
-        api_key,
-    )
+
+    check_tweet_like: bool
+    if LIKE_BUFFER_ENABLED and api_key is not None:
+        like_buffer.add(api_key, tweet_id, False)
+        check_tweet_like = True
+    else:
+        check_tweet_like = await delete_like_by_tweet_id(
+            session,
+            tweet_id,
+            api_key,
+        )
 
     if not check_tweet_like:
         raise HTTPException(
@@ -234,14 +500,64 @@ async def delete_like_tweet(
         )
 
     response: ResultBase = build_result_response(True)
-    return response
+    return build_json_response(response)
+
+
+@router.get("/hashtags/{tag}/tweets", response_model=TweetsOut, status_code=200)
+async def get_hashtag_tweets(
+    tag: Annotated[str, Path(min_length=1, max_length=101)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=FEED_MAX_PAGE_SIZE)] = FEED_PAGE_SIZE,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """
+    Эндпоинт для получения страницы твитов с хэштегом, от новых к старым
+    :param tag: Хэштег, с # или без, в любом регистре
+    :param cursor: Курсор следующей страницы из предыдущего ответа
+    :param limit: Размер страницы
+    :param session: AsyncSession
+    :return: JSON страницы по схеме TweetsOut
+    """
+    after: Tuple[int, ...] | None = None
+    if cursor is not None:
+        after = decode_cursor(cursor, 1)
+
+        if after is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor",
+            )
+
+    rows: Sequence[Row] = await get_hashtag_tweets_json(
+        session,
+        tag.removeprefix("#").lower(),
+        limit,
+        after,
+    )
+    content: bytes = build_get_tweets_json(rows, limit, sort_key=hashtag_sort_key)
+
+    return Response(content=content, media_type="application/json")
+
+
+@router.get("/trending", response_model=TrendingOut, status_code=200)
+async def get_trending() -> Response:
+    """
+    Эндпоинт для получения популярных за окно твитов и хэштегов.
+    Отдает топ, пересчитанный в фоне, без запросов к базе
+    :return: Схема TrendingOut
+    """
+    response: TrendingOut = build_trending_response(
+        trending.top_tweets,
+        trending.top_hashtags,
+    )
+    return build_json_response(response)
 
 
 @router.get("/users/me", response_model=UserOut, status_code=200)
 async def get_user_me(
     request: Request,
     session: AsyncSession = Depends(get_async_session),
-) -> UserOut:
+) -> Response:
     """
     Эндпоинт для получения своего профиля
     :param request: Запрос
@@ -249,53 +565,126 @@ async def get_user_me(
     :return: Схема UserOut
     """
     api_key: str | None = request.headers.get("api-key")
-    user: User | None = await get_user_with_followers_and_following_by_api_key(
-        session,
-        api_key,
+    profile: UserProfile | None = (
+        await get_user_with_followers_and_following_by_api_key(session, api_key)
     )
 
-    if not user:
+    if not profile:
         raise HTTPException(
             status_code=404,
             detail="User not found",
         )
 
-    response: UserOut = build_get_user_response(user)
-    return response
+    response: UserOut = build_get_user_response(profile, FOLLOW_PAGE_SIZE)
+    return build_json_response(response)
 
 
 @router.get("/users/{id}", response_model=UserOut, status_code=200)
 async def get_user_by_id(
-    user_id: Annotated[int, Path(alias="id")],
+    user_id: Annotated[int, Path(alias="id", ge=1, le=ID_MAX)],
     session: AsyncSession = Depends(get_async_session),
-) -> UserOut:
+) -> Response:
     """
     Эндпоинт для получения юзера по id
     :param user_id: id юзера
     :param session: AsyncSession
     :return: Схема UserOut
     """
-    user: User | None = await get_user_with_followers_and_following_by_id(
+    profile: UserProfile | None = await get_user_with_followers_and_following_by_id(
         session,
         user_id,
     )
 
-    if not user:
+    if not profile:
         raise HTTPException(
             status_code=404,
             detail="User not found",
         )
 
-    response: UserOut = build_get_user_response(user)
-    return response
+    response: UserOut = build_get_user_response(profile, FOLLOW_PAGE_SIZE)
+    return build_json_response(response)
+
+
+@router.get("/users/{id}/followers", response_model=FollowsOut, status_code=200)
+async def get_user_followers(
+    user_id: Annotated[int, Path(alias="id", ge=1, le=ID_MAX)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=FOLLOW_MAX_PAGE_SIZE)] = FOLLOW_PAGE_SIZE,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """
+    Эндпоинт для получения страницы подписчиков юзера
+    :param user_id: id юзера
+    :param cursor: Курсор следующей страницы из предыдущего ответа
+    :param limit: Размер страницы
+    :param session: AsyncSession
+    :return: Схема FollowsOut
+    """
+    after: Tuple[int, ...] | None = None
+    if cursor is not None:
+        after = decode_cursor(cursor, 1)
+
+        if after is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor",
+            )
+
+    rows: Sequence[Row] = await get_followers_page(session, user_id, limit, after)
+
+    if not rows and not await check_user_exists(session, user_id):
+        raise HTTPException(
+            status_code=404,
+            detail="User not found",
+        )
+
+    response: FollowsOut = build_get_follows_response(rows, limit)
+    return build_json_response(response)
+
+
+@router.get("/users/{id}/following", response_model=FollowsOut, status_code=200)
+async def get_user_following(
+    user_id: Annotated[int, Path(alias="id", ge=1, le=ID_MAX)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=FOLLOW_MAX_PAGE_SIZE)] = FOLLOW_PAGE_SIZE,
+    session: AsyncSession = Depends(get_async_session),
+) -> Response:
+    """
+    Эндпоинт для получения страницы подписок юзера
+    :param user_id: id юзера
+    :param cursor: Курсор следующей страницы из предыдущего ответа
+    :param limit: Размер страницы
+    :param session: AsyncSession
+    :return: Схема FollowsOut
+    """
+    after: Tuple[int, ...] | None = None
+    if cursor is not None:
+        after = decode_cursor(cursor, 1)
+
+        if after is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor",
+            )
+
+    rows: Sequence[Row] = await get_following_page(session, user_id, limit, after)
+
+    if not rows and not await check_user_exists(session, user_id):
+        raise HTTPException(
+            status_code=404,
+            detail="User not found",
+        )
+
+    response: FollowsOut = build_get_follows_response(rows, limit)
+    return build_json_response(response)
 
 
 @router.post("/users/{id}/follow", response_model=ResultBase, status_code=201)
 async def follow_user(
     request: Request,
-    user_id: Annotated[int, Path(alias="id")],
+    user_id: Annotated[int, Path(alias="id", ge=1, le=ID_MAX)],
     session: AsyncSession = Depends(get_async_session),
-) -> ResultBase:
+) -> Response:
     """
     Эндпоинт для подписки на юзера по id
     :param request: Запрос
@@ -313,15 +702,15 @@ async def follow_user(
         )
 
     response: ResultBase = build_result_response(True)
-    return response
+    return build_json_response(response, status_code=201)
 
 
 @router.delete("/users/{id}/follow", response_model=ResultBase, status_code=200)
 async def unfollow_user(
     request: Request,
-    user_id: Annotated[int, Path(alias="id")],
+    user_id: Annotated[int, Path(alias="id", ge=1, le=ID_MAX)],
     session: AsyncSession = Depends(get_async_session),
-) -> ResultBase:
+) -> Response:
     """
     Эндпоинт для отписки от юзера по id
     :param request: Запрос
@@ -339,14 +728,14 @@ async def unfollow_user(
         )
 
     response: ResultBase = build_result_response(True)
-    return response
+    return build_json_response(response)
 
 
 @router.post("/register", response_model=ResultBase, status_code=201)
 async def register_user(
     user: UserIn,
     session: AsyncSession = Depends(get_async_session),
-) -> ResultBase:
+) -> Response:
     """
     Эндпоинт для регистрации пользователя
     :param user: Схема UserIn
@@ -362,4 +751,25 @@ async def register_user(
         )
 
     response: ResultBase = build_result_response(True)
-    return response
+    return build_json_response(response, status_code=201)
+
+
+@router.get("/metrics", response_model=MetricsOut, status_code=200)
+async def get_metrics() -> Response:
+    """
+    Эндпоинт для получения внутренних метрик процесса
+    :return: Схема MetricsOut
+    """
+    response: MetricsOut = build_metrics_response(
+        {
+            "api_key_cache": api_key_cache.stats(),
+            "media_cache": media_cache.stats(),
+            "feed_cache": feed_cache.stats(),
+            "invalidation": invalidation_listener.stats(),
+            "like_buffer": like_buffer.stats(),
+            "trending": trending.stats(),
+            "single_flight": single_flight_group.stats(),
+            "db_pool": get_pool_stats(),
+        },
+    )
+    return build_json_response(response)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseModel
 
@@ -60,9 +60,10 @@ class TweetOut(ResultBase):
 
 
 class TweetsOut(ResultBase):
-    """Схема для отдачи всех твитов. Родитель - ResultBase"""
+    """Схема для отдачи страницы твитов. Родитель - ResultBase"""
 
     tweets: List[TweetBase]
+    next_cursor: str | None = None
 
 
 class FollowBase(AuthorBase):
@@ -77,13 +78,54 @@ class UserIn(BaseModel):
 
 
 class UserBase(AuthorBase):
-    """Схема юзера с подписчиками и подписками. Родитель - AuthorBase"""
+    """
+    Схема юзера с количеством подписчиков и подписок и первыми страницами
+    их списков. Родитель - AuthorBase
+    """
 
     followers: List[FollowBase] | None = []
     following: List[FollowBase] | None = []
+    followers_count: int = 0
+    following_count: int = 0
+    followers_next_cursor: str | None = None
+    following_next_cursor: str | None = None
 
 
 class UserOut(ResultBase):
     """Схема юзера. Родитель - ResultBase"""
 
     user: UserBase
+
+
+class FollowsOut(ResultBase):
+    """Схема для отдачи страницы подписчиков или подписок. Родитель - ResultBase"""
+
+    users: List[FollowBase]
+    next_cursor: str | None = None
+
+
+class TrendingTweetBase(BaseModel):
+    """Схема популярного твита с количеством лайков за окно"""
+
+    id: int
+    likes: int
+
+
+class TrendingHashtagBase(BaseModel):
+    """Схема популярного хэштега с количеством твитов за окно"""
+
+    tag: str
+    count: int
+
+
+class TrendingOut(ResultBase):
+    """Схема для отдачи популярных твитов и хэштегов. Родитель - ResultBase"""
+
+    tweets: List[TrendingTweetBase]
+    hashtags: List[TrendingHashtagBase]
+
+
+class MetricsOut(ResultBase):
+    """Схема внутренних метрик процесса. Родитель - ResultBase"""
+
+    metrics: Dict[str, Dict[str, int | float]]
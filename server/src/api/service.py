@@ -1,61 +1,218 @@
-from typing import Sequence, List
+import re
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, Sequence, List, Tuple, Type
 
 from fastapi import UploadFile
 from sqlalchemy import (
     select,
     delete,
+    update,
     Select,
     Result,
     Delete,
+    Update,
     CursorResult,
+    CTE,
+    CompoundSelect,
+    Cast,
+    ColumnElement,
+    Row,
+    ScalarSelect,
+    Subquery,
+    BindParameter,
+    Function,
+    Integer,
+    REAL,
+    String,
+    Text,
+    cast,
+    column,
+    values,
+    any_,
+    bindparam,
     desc,
+    exists,
     func,
+    literal,
+    literal_column,
+    tuple_,
+    union_all,
 )
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert, Insert
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased
+from sqlalchemy.sql.dml import ReturningDelete
 
-from .models import User, Tweet, TweetLike, Follower, Media
+from src.config import (
+    FILE_DIR,
+    TWEET_MAX_ATTACHMENTS,
+    FEED_CACHE_STALENESS,
+    EXPORT_BATCH_SIZE,
+    FOLLOW_PAGE_SIZE,
+    INVALIDATION_CHANNEL,
+    TRENDING_CHANNEL,
+)
+from src.database import async_session
+from .cache import api_key_cache
+from .invalidation import (
+    build_invalidation,
+    notify_message,
+    publish_invalidation,
+    queue_message,
+)
+from .loaders import loader_profile
+from .models import (
+    SEARCH_CONFIG,
+    Base,
+    User,
+    Tweet,
+    TweetLike,
+    Follower,
+    Media,
+    MediaBlob,
+    TimelineEntry,
+    Hashtag,
+    TweetHashtag,
+    Mention,
+    TweetMention,
+)
 from .schemas import TweetIn, UserIn
-from .utils import upload_media
+from .singleflight import single_flight
+from .trending import build_trending_update, publish_trending
+from .variants import remove_variants
+from .utils import (
+    UploadedFile,
+    UserProfile,
+    HASHTAG_PATTERN,
+    MENTION_PATTERN,
+    build_blob_path,
+    extract_terms,
+    remove_file,
+    store_blob,
+    upload_media,
+)
+
+# (шаблон терма, колонка терма, таблица связи, колонка связи с термом)
+TWEET_TERM_INDEXES: List[Tuple[re.Pattern, InstrumentedAttribute, Type[Base], str]] = [
+    (HASHTAG_PATTERN, Hashtag.tag, TweetHashtag, "hashtag_id"),
+    (MENTION_PATTERN, Mention.name, TweetMention, "mention_id"),
+]
 
 
 async def create_media(
     session: AsyncSession,
     file: UploadFile,
+    api_key: str | None,
 ) -> Media | None:
     """
-    Функция создания объекта Media
+    Функция создания объекта Media. Тип контента берется из сигнатуры файла.
+    Файл хранится по SHA-256 содержимого: одинаковые файлы хранятся один раз,
+    а у MediaBlob увеличивается счетчик ссылок
     :param session: AsyncSession
     :param file: Загружаемый файл
+    :param api_key: api-key загрузившего файл
     :return: Media или None
     """
-    unique_filename: str = await upload_media(file)
+    uploaded: UploadedFile | None = await upload_media(file)
 
-    new_media: Media = Media(
-        filename=unique_filename,
-        content_type=file.content_type,
-    )
-    session.add(new_media)
-    await session.commit()
+    if uploaded is None:
+        return None
+
+    blob_path: str = build_blob_path(uploaded.sha256)
+
+    try:
+        blob_stmt: Insert = (
+            insert(MediaBlob)
+            .values(sha256=uploaded.sha256, size=uploaded.size, ref_count=1)
+            .on_conflict_do_update(
+                index_elements=[MediaBlob.sha256],
+                set_={"ref_count": MediaBlob.ref_count + 1},
+            )
+        )
+        await session.execute(blob_stmt)
+
+        new_media: Media = Media(
+            filename=blob_path,
+            content_type=uploaded.content_type,
+            uploader_api_key=api_key,
+            sha256=uploaded.sha256,
+        )
+        session.add(new_media)
+        await session.commit()
+    except BaseException:
+        await remove_file(uploaded.temp_path)
+        raise
+
+    await store_blob(uploaded.temp_path, blob_path)
 
     return new_media
 
 
+async def release_media_blobs(
+    session: AsyncSession,
+    blob_hashes: Sequence[str],
+) -> None:
+    """
+    Функция уменьшения счетчиков ссылок MediaBlob после удаления объектов Media.
+    Блобы без ссылок удаляются вместе с файлами и уменьшенными копиями
+    до фиксации транзакции, пока строки заблокированы, чтобы параллельная
+    загрузка того же файла дождалась удаления и записала файл заново
+    :param session: AsyncSession
+    :param blob_hashes: SHA-256 удаленных объектов Media (с повторами)
+    """
+    if not blob_hashes:
+        return
+
+    deltas = values(
+        column("sha256", String),
+        column("refs", Integer),
+        name="deltas",
+    ).data(list(Counter(blob_hashes).items()))
+    stmt: Update = (
+        update(MediaBlob)
+        .where(MediaBlob.sha256 == deltas.c.sha256)
+        .values(ref_count=MediaBlob.ref_count - deltas.c.refs)
+        .returning(MediaBlob.sha256, MediaBlob.ref_count)
+        .execution_options(synchronize_session=False)
+    )
+    result: Result = await session.execute(stmt)
+    unused: List[str] = [sha256 for sha256, refs in result.all() if refs <= 0]
+
+    if not unused:
+        return
+
+    delete_stmt: Delete = (
+        delete(MediaBlob)
+        .where(MediaBlob.sha256.in_(unused))
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(delete_stmt)
+
+    for sha256 in unused:
+        await remove_file(f"{FILE_DIR}/{build_blob_path(sha256)}")
+        await remove_variants(build_blob_path(sha256))
+
+
+@single_flight
 async def get_media(
     session: AsyncSession,
     media_id: int,
-) -> Media | None:
+) -> Row | None:
     """
-    Функция для получения объекта Media по id
+    Функция для получения файла по id
     :param session: AsyncSession
     :param media_id: id файла
-    :return: Media или None
+    :return: Строка (id, filename, content_type, sha256) или None
     """
-    stmt: Select = select(Media).where(Media.id == media_id)
+    stmt: Select = select(
+        Media.id,
+        Media.filename,
+        Media.content_type,
+        Media.sha256,
+    ).where(Media.id == media_id)
 
     result: Result = await session.execute(stmt)
-    media: Media | None = result.scalar_one_or_none()
+    media: Row | None = result.one_or_none()
 
     return media
 
@@ -66,73 +223,483 @@ async def create_tweet_by_schema(
     api_key: str | None,
 ) -> Tweet | None:
     """
-    Функция создания твита по схеме
+    Функция создания твита по схеме.
+    Файлы проверяются одним запросом: все они должны существовать,
+    принадлежать автору и еще не быть прикреплены к другому твиту.
+    Затем прикрепляются одним UPDATE
     :param session: AsyncSession
     :param tweet: Входная схема твита
     :param api_key: api-key автора
     :return: Объект таблицы Tweet или None
     """
-    attachments: List[Media] = []
-    for media_id in tweet.tweet_media_ids:
-        stmt: Select = select(Media).where(Media.id == media_id)
+    media_ids: List[int] = list(dict.fromkeys(tweet.tweet_media_ids))
+
+    if len(media_ids) > TWEET_MAX_ATTACHMENTS:
+        return None
+
+    ids_param: BindParameter = bindparam(
+        "media_ids",
+        media_ids,
+        type_=ARRAY(Integer),
+    )
+
+    if media_ids:
+        stmt: Select = (
+            select(Media.id)
+            .where(
+                (Media.id == any_(ids_param))
+                & (Media.uploader_api_key == api_key)
+                & (Media.tweet_id.is_(None)),
+            )
+            .with_for_update()
+        )
         result: Result = await session.execute(stmt)
-        media: Media = result.scalars().one_or_none()  # type: ignore
-        attachments.append(media)
+
+        if len(result.scalars().all()) != len(media_ids):
+            await session.rollback()
+            return None
 
     new_tweet: Tweet = Tweet(
         content=tweet.tweet_data,
         author_api_key=api_key,
-        attachments=attachments,
     )
     session.add(new_tweet)
+    await session.flush()
+
+    if media_ids:
+        attach_stmt: Update = (
+            update(Media)
+            .where(Media.id == any_(ids_param))
+            .values(tweet_id=new_tweet.id)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(attach_stmt)
+
+    await index_tweet_terms(session, [(new_tweet.id, new_tweet.content)])
+
+    tags: List[str] = extract_terms(HASHTAG_PATTERN, new_tweet.content)
+    if tags:
+        await publish_trending(session, hashtags=[(tag, 1) for tag in tags])
+
+    await publish_invalidation(session, "feed")
     await session.commit()
 
     return new_tweet
 
 
+async def index_tweet_terms(
+    session: AsyncSession,
+    tweets: Sequence[Tuple[int, str]],
+) -> None:
+    """
+    Функция сохранения хэштегов и упоминаний твитов в текущей транзакции.
+    Для каждого вида термов выполняются два пакетных запроса: вставка новых
+    термов и вставка связей с твитами. Повторный вызов для тех же твитов
+    ничего не меняет
+    :param session: AsyncSession
+    :param tweets: Пары (id твита, текст твита)
+    """
+    for pattern, term_column, link_model, link_column in TWEET_TERM_INDEXES:
+        pairs: List[Tuple[int, str]] = [
+            (tweet_id, term)
+            for tweet_id, content in tweets
+            for term in extract_terms(pattern, content)
+        ]
+
+        if not pairs:
+            continue
+
+        term_model: Any = term_column.class_
+        # Термы вставляются в одном порядке, чтобы параллельные
+        # транзакции не взаимоблокировались на уникальном индексе
+        terms_stmt: Insert = (
+            insert(term_model)
+            .values([{term_column.key: term} for term in sorted({t for _, t in pairs})])
+            .on_conflict_do_nothing(index_elements=[term_column.key])
+        )
+        await session.execute(terms_stmt)
+
+        terms = values(
+            column("tweet_id", Integer),
+            column("term", String),
+            name="terms",
+        ).data(pairs)
+        links_stmt: Insert = (
+            insert(link_model)
+            .from_select(
+                ["tweet_id", link_column],
+                select(terms.c.tweet_id, term_model.id).join(
+                    term_model,
+                    term_column == terms.c.term,
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=[link_column, "tweet_id"])
+        )
+        await session.execute(links_stmt)
+
+
+async def fan_out_tweet(tweet_id: int) -> None:
+    """
+    Функция раскладки твита в ленты автора и его подписчиков.
+    Выполняется в фоне одним INSERT ... SELECT в отдельной сессии.
+    Если твит успел удалиться, ничего не вставляется
+    :param tweet_id: id твита
+    """
+    author = aliased(User)
+    subscriber = aliased(User)
+    recipients: CompoundSelect = union_all(
+        select(author.id.label("user_id"), Tweet.id, Tweet.id)
+        .join(author, author.api_key == Tweet.author_api_key)
+        .where(Tweet.id == tweet_id),
+        select(subscriber.id, Tweet.id, Tweet.id)
+        .join(author, author.api_key == Tweet.author_api_key)
+        .join(Follower, Follower.following_id == author.id)
+        .join(subscriber, subscriber.api_key == Follower.follower_api_key)
+        .where(Tweet.id == tweet_id),
+    )
+    stmt: Insert = (
+        insert(TimelineEntry)
+        .from_select(["user_id", "tweet_id", "score"], recipients)
+        .on_conflict_do_nothing()
+    )
+
+    async with async_session() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def get_timeline_tweets(
+    session: AsyncSession,
+    api_key: str | None,
+    limit: int,
+    cursor: Tuple[int, ...] | None = None,
+) -> Sequence[Tweet]:
+    """
+    Функция получения страницы ленты подписок пользователя
+    из материализованной таблицы timeline_entry.
+    Возвращает на один твит больше, чем limit, чтобы понять, есть ли следующая
+    страница
+    :param session: AsyncSession
+    :param api_key: api-key владельца ленты
+    :param limit: Размер страницы
+    :param cursor: Ключ сортировки (score, id твита) последнего твита
+    предыдущей страницы
+    :return: Последовательность твитов
+    """
+    user_id: Select = select(User.id).where(User.api_key == api_key)
+    stmt: Select = (
+        select(Tweet)
+        .join(TimelineEntry, TimelineEntry.tweet_id == Tweet.id)
+        .options(*loader_profile("feed"))
+        .where(TimelineEntry.user_id == user_id.scalar_subquery())
+        .order_by(desc(TimelineEntry.score), desc(TimelineEntry.tweet_id))
+        .limit(limit + 1)
+    )
+
+    if cursor is not None:
+        stmt = stmt.where(
+            tuple_(TimelineEntry.score, TimelineEntry.tweet_id)
+            < tuple_(*(literal(value) for value in cursor))
+        )
+
+    result: Result = await session.execute(stmt)
+    tweets: Sequence[Tweet] = result.scalars().all()
+
+    return tweets
+
+
 async def get_all_tweets(
     session: AsyncSession,
+    limit: int,
+    cursor: Tuple[int, ...] | None = None,
 ) -> Sequence[Tweet] | None:
     """
-    Функция получения всех твитов со ссылками на файлы, автором и лайками
-    отсортированных в порядке убывания по популярности
+    Функция получения страницы твитов со ссылками на файлы, автором и лайками
+    отсортированных в порядке убывания по популярности.
+    Возвращает на один твит больше, чем limit, чтобы понять, есть ли следующая
+    страница
     :param session: AsyncSession
+    :param limit: Размер страницы
+    :param cursor: Ключ сортировки (количество лайков, id) последнего твита
+    предыдущей страницы
     :return: Последовательность твитов
     """
     stmt: Select = (
         select(Tweet)
-        .options(selectinload(Tweet.attachments))
-        .options(selectinload(Tweet.author))
-        .options(selectinload(Tweet.likes))
-        .outerjoin(Tweet.likes)
-        .order_by(desc(func.count(Tweet.likes)))
-        .group_by(Tweet.id)
+        .options(*loader_profile("feed"))
+        .order_by(desc(Tweet.like_count), desc(Tweet.id))
+        .limit(limit + 1)
     )
 
+    if cursor is not None:
+        stmt = stmt.where(
+            tuple_(Tweet.like_count, Tweet.id)
+            < tuple_(*(literal(value) for value in cursor)),
+        )
+
     result: Result = await session.execute(stmt)
     tweets: Sequence[Tweet] | None = result.scalars().all()
 
     return tweets
 
 
+def select_tweets_json() -> Select:
+    """
+    Функция построения запроса твитов в виде JSON, собранного в Postgres,
+    без загрузки ORM-объектов. Порядок и состав полей совпадают со схемой TweetBase
+    :return: Select строк (like_count, id, tweet) без сортировки и фильтров
+    """
+    author = aliased(User)
+    like_user = aliased(User)
+
+    attachments: ScalarSelect = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(func.concat("/api/medias/", Media.id), Media.id),
+                ),
+                literal_column("'[]'::json"),
+            ),
+        )
+        .where(Media.tweet_id == Tweet.id)
+        .scalar_subquery()
+    )
+    likes: ScalarSelect = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(
+                            "user_id",
+                            like_user.id,
+                            "name",
+                            like_user.name,
+                        ),
+                        TweetLike.id,
+                    ),
+                ),
+                literal_column("'[]'::json"),
+            ),
+        )
+        .join(like_user, like_user.api_key == TweetLike.user_api_key)
+        .where(TweetLike.tweet_id == Tweet.id)
+        .scalar_subquery()
+    )
+    # Текст JSON без декодирования драйвером: строки склеиваются в ответ как есть
+    tweet_json: Cast = cast(
+        func.json_build_object(
+            "id",
+            Tweet.id,
+            "content",
+            Tweet.content,
+            "attachments",
+            attachments,
+            "author",
+            func.json_build_object("id", author.id, "name", author.name),
+            "likes",
+            likes,
+        ),
+        Text,
+    )
+
+    stmt: Select = select(
+        Tweet.like_count,
+        Tweet.id,
+        tweet_json.label("tweet"),
+    ).join(author, author.api_key == Tweet.author_api_key)
+
+    return stmt
+
+
+@single_flight
+async def get_all_tweets_json(
+    session: AsyncSession,
+    limit: int,
+    cursor: Tuple[int, ...] | None = None,
+) -> Sequence[Row]:
+    """
+    Функция получения страницы твитов в виде JSON, собранного в Postgres,
+    отсортированных в порядке убывания по популярности.
+    Возвращает на один твит больше, чем limit, чтобы понять, есть ли следующая
+    страница
+    :param session: AsyncSession
+    :param limit: Размер страницы
+    :param cursor: Ключ сортировки (количество лайков, id) последнего твита
+    предыдущей страницы
+    :return: Последовательность строк (like_count, id, tweet) с JSON твита
+    """
+    stmt: Select = (
+        select_tweets_json()
+        .order_by(desc(Tweet.like_count), desc(Tweet.id))
+        .limit(limit + 1)
+    )
+
+    if cursor is not None:
+        stmt = stmt.where(
+            tuple_(Tweet.like_count, Tweet.id)
+            < tuple_(*(literal(value) for value in cursor)),
+        )
+
+    result: Result = await session.execute(stmt)
+    rows: Sequence[Row] = result.all()
+
+    return rows
+
+
+async def search_tweets_json(
+    session: AsyncSession,
+    query: str,
+    limit: int,
+    cursor: Tuple[float, int] | None = None,
+    author_id: int | None = None,
+) -> Sequence[Row]:
+    """
+    Функция полнотекстового поиска твитов в виде JSON, собранного в Postgres,
+    отсортированных по убыванию релевантности. Совпадения отбираются
+    по GIN-индексу колонки content_tsv. Возвращает на один твит больше,
+    чем limit, чтобы понять, есть ли следующая страница
+    :param session: AsyncSession
+    :param query: Поисковый запрос в синтаксисе websearch_to_tsquery
+    :param limit: Размер страницы
+    :param cursor: Ключ сортировки (релевантность, id) последнего твита
+    предыдущей страницы
+    :param author_id: id автора для фильтрации
+    :return: Последовательность строк (like_count, id, tweet, rank) с JSON твита
+    """
+    tsquery: Function = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    rank: Function = func.ts_rank(Tweet.content_tsv, tsquery, type_=REAL)
+
+    stmt: Select = (
+        select_tweets_json()
+        .add_columns(rank.label("rank"))
+        .where(Tweet.content_tsv.bool_op("@@")(tsquery))
+        .order_by(desc(rank), desc(Tweet.id))
+        .limit(limit + 1)
+    )
+
+    if cursor is not None:
+        # Релевантность сравнивается в real, как ее вернул ts_rank
+        stmt = stmt.where(
+            tuple_(rank, Tweet.id)
+            < tuple_(cast(cursor[0], REAL), literal(cursor[1])),
+        )
+
+    if author_id is not None:
+        author_api_key: ScalarSelect = (
+            select(User.api_key).where(User.id == author_id).scalar_subquery()
+        )
+        stmt = stmt.where(Tweet.author_api_key == author_api_key)
+
+    result: Result = await session.execute(stmt)
+    rows: Sequence[Row] = result.all()
+
+    return rows
+
+
+async def get_hashtag_tweets_json(
+    session: AsyncSession,
+    tag: str,
+    limit: int,
+    cursor: Tuple[int, ...] | None = None,
+) -> Sequence[Row]:
+    """
+    Функция получения страницы твитов с хэштегом в виде JSON, собранного
+    в Postgres, в порядке убывания id. Страница читается по индексу
+    (hashtag_id, tweet_id). Возвращает на один твит больше, чем limit,
+    чтобы понять, есть ли следующая страница
+    :param session: AsyncSession
+    :param tag: Хэштег в нижнем регистре без #
+    :param limit: Размер страницы
+    :param cursor: Ключ сортировки (id) последнего твита предыдущей страницы
+    :return: Последовательность строк (like_count, id, tweet) с JSON твита
+    """
+    hashtag_id: ScalarSelect = (
+        select(Hashtag.id).where(Hashtag.tag == tag).scalar_subquery()
+    )
+    stmt: Select = (
+        select_tweets_json()
+        .join(TweetHashtag, TweetHashtag.tweet_id == Tweet.id)
+        .where(TweetHashtag.hashtag_id == hashtag_id)
+        .order_by(desc(TweetHashtag.tweet_id))
+        .limit(limit + 1)
+    )
+
+    if cursor is not None:
+        stmt = stmt.where(TweetHashtag.tweet_id < cursor[0])
+
+    result: Result = await session.execute(stmt)
+    rows: Sequence[Row] = result.all()
+
+    return rows
+
+
+async def stream_tweets_json(since_id: int = 0) -> AsyncIterator[str]:
+    """
+    Функция потоковой выгрузки всех твитов в формате NDJSON в порядке возрастания id.
+    Строки читаются серверным курсором порциями по EXPORT_BATCH_SIZE, поэтому
+    потребление памяти не зависит от размера таблицы. Сессия открывается
+    внутри генератора: ответ отдается после завершения зависимостей запроса
+    :param since_id: id последнего уже полученного твита
+    :return: Асинхронный итератор частей NDJSON
+    """
+    stmt: Select = (
+        select_tweets_json()
+        .where(Tweet.id > since_id)
+        .order_by(Tweet.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    async with async_session() as session:
+        result: AsyncResult = await session.stream(stmt)
+
+        async for partition in result.partitions():
+            yield "".join(f"{row.tweet}\n" for row in partition)
+
+
 async def delete_tweet_by_id(
     session: AsyncSession,
     tweet_id: int,
     api_key: str | None,
 ) -> bool:
     """
-    Функция удаления твита по id
+    Функция удаления твита по id.
+    Файлы твита удаляются явно, чтобы освободить ссылки на их содержимое.
+    Записи твита в лентах подписчиков удаляются каскадно по внешнему ключу
     :param session: AsyncSession
     :param tweet_id: id твита
     :param api_key: api-key автора
     :return: Логический результат
     """
-    stmt: Delete = delete(Tweet).where(
+    owned_tweet: Select = select(Tweet.id).where(
         (Tweet.id == tweet_id) & (Tweet.author_api_key == api_key),
     )
+    media_stmt: ReturningDelete = (
+        delete(Media)
+        .where(Media.tweet_id.in_(owned_tweet))
+        .returning(Media.id, Media.sha256)
+        .execution_options(synchronize_session=False)
+    )
+    media_result: Result = await session.execute(media_stmt)
+    media_rows: Sequence[Row] = media_result.all()
+    blob_hashes: List[str] = [row.sha256 for row in media_rows if row.sha256]
 
-    result: CursorResult = await session.execute(stmt)
-    if result.rowcount > 0:
+    stmt: ReturningDelete = (
+        delete(Tweet)
+        .where((Tweet.id == tweet_id) & (Tweet.author_api_key == api_key))
+        .returning(Tweet.content)
+    )
+
+    result: Result = await session.execute(stmt)
+    content: str | None = result.scalar_one_or_none()
+    if content is not None:
+        await release_media_blobs(session, blob_hashes)
+        await publish_trending(
+            session,
+            hashtags=[(tag, -1) for tag in extract_terms(HASHTAG_PATTERN, content)],
+            forget=[tweet_id],
+        )
+        await publish_invalidation(session, "media", [row.id for row in media_rows])
+        await publish_invalidation(session, "feed")
         await session.commit()
         return True
 
@@ -145,23 +712,59 @@ async def like_by_tweet_id(
     api_key: str | None,
 ) -> bool:
     """
-    Функция добавления твита в понравившиеся по id
+    Функция добавления твита в понравившиеся по id одним запросом:
+    вставка лайка с ON CONFLICT DO NOTHING, увеличение like_count только
+    для вставленной строки и уведомление об инвалидации ленты.
+    Повторный лайк ничего не меняет и не вызывает ошибку
     :param session: AsyncSession
     :param tweet_id: id объекта Tweet
     :param api_key: api-key автора
-    :return: Логический результат
+    :return: Логический результат (False, если твита или юзера нет)
     """
-    try:
-        new_like: TweetLike = TweetLike(
-            user_api_key=api_key,
-            tweet_id=tweet_id,
-        )
-        session.add(new_like)
-        await session.commit()
-        return True
+    message: Dict[str, Any] = build_invalidation(
+        "feed",
+        older_than=FEED_CACHE_STALENESS,
+    )
+    update_message: Dict[str, Any] = build_trending_update(likes=[(tweet_id, 1)])
+    source: Select = (
+        select(User.api_key, Tweet.id)
+        .join(Tweet, Tweet.id == tweet_id)
+        .where(User.api_key == api_key)
+    )
+    inserted: CTE = (
+        insert(TweetLike)
+        .from_select(["user_api_key", "tweet_id"], source)
+        .on_conflict_do_nothing(index_elements=["user_api_key", "tweet_id"])
+        .returning(TweetLike.tweet_id)
+        .cte("inserted")
+    )
+    counted: CTE = (
+        update(Tweet)
+        .where(Tweet.id.in_(select(inserted.c.tweet_id)))
+        .values(like_count=Tweet.like_count + 1)
+        .returning(Tweet.id)
+        .cte("counted")
+    )
+    stmt: Select = select(
+        exists(source).label("found"),
+        exists(select(counted.c.id)).label("liked"),
+        select(notify_message(INVALIDATION_CHANNEL, message))
+        .where(exists(select(counted.c.id)))
+        .scalar_subquery(),
+        select(notify_message(TRENDING_CHANNEL, update_message))
+        .where(exists(select(counted.c.id)))
+        .scalar_subquery(),
+    )
+
+    result: Result = await session.execute(stmt)
+    row: Row = result.one()
+
+    if row.liked:
+        queue_message(session, INVALIDATION_CHANNEL, message)
+        queue_message(session, TRENDING_CHANNEL, update_message)
+    await session.commit()
 
-    except IntegrityError:
-        return False
+    return row.found
 
 
 async def delete_like_by_tweet_id(
@@ -170,104 +773,337 @@ async def delete_like_by_tweet_id(
     api_key: str | None,
 ) -> bool:
     """
-    Функция удаления твита из понравившихся по id
+    Функция удаления твита из понравившихся по id одним запросом:
+    удаление лайка, уменьшение like_count и уведомление об инвалидации ленты
     :param session: AsyncSession
     :param tweet_id: id твита
     :param api_key: api-key автора
     :return: Логический результат
     """
-    stmt: Delete = delete(TweetLike).where(
-        (TweetLike.user_api_key == api_key) & (TweetLike.tweet_id == tweet_id),
+    message: Dict[str, Any] = build_invalidation(
+        "feed",
+        older_than=FEED_CACHE_STALENESS,
+    )
+    update_message: Dict[str, Any] = build_trending_update(likes=[(tweet_id, -1)])
+    deleted: CTE = (
+        delete(TweetLike)
+        .where(
+            (TweetLike.user_api_key == api_key) & (TweetLike.tweet_id == tweet_id),
+        )
+        .returning(TweetLike.tweet_id)
+        .cte("deleted")
+    )
+    counted: CTE = (
+        update(Tweet)
+        .where(Tweet.id.in_(select(deleted.c.tweet_id)))
+        .values(like_count=Tweet.like_count - 1)
+        .returning(Tweet.id)
+        .cte("counted")
+    )
+    stmt: Select = select(
+        exists(select(counted.c.id)).label("unliked"),
+        select(notify_message(INVALIDATION_CHANNEL, message))
+        .where(exists(select(counted.c.id)))
+        .scalar_subquery(),
+        select(notify_message(TRENDING_CHANNEL, update_message))
+        .where(exists(select(counted.c.id)))
+        .scalar_subquery(),
     )
 
-    result: CursorResult = await session.execute(stmt)
-    if result.rowcount > 0:
+    result: Result = await session.execute(stmt)
+    row: Row = result.one()
+
+    if row.unliked:
+        queue_message(session, INVALIDATION_CHANNEL, message)
+        queue_message(session, TRENDING_CHANNEL, update_message)
         await session.commit()
         return True
 
     return False
 
 
-async def get_user_by_api_key(
+async def apply_like_toggles(
     session: AsyncSession,
-    api_key: str | None,
-) -> User | None:
+    toggles: Dict[Tuple[str, int], bool],
+) -> None:
     """
-    Функция получения юзера по api-key
+    Функция пакетного применения лайков и их отмен из буфера записи:
+    один многострочный INSERT ... ON CONFLICT DO NOTHING и один DELETE,
+    like_count меняется только для фактически вставленных и удаленных строк.
+    Лайки несуществующих твитов и юзеров отбрасываются
+    :param session: AsyncSession
+    :param toggles: Итоговое состояние лайка по паре (api-key, id твита)
+    """
+    likes: List[Tuple[str, int]] = [key for key, liked in toggles.items() if liked]
+    unlikes: List[Tuple[str, int]] = [
+        key for key, liked in toggles.items() if not liked
+    ]
+    deltas: Counter = Counter()
+
+    if likes:
+        pairs = values(
+            column("user_api_key", String),
+            column("tweet_id", Integer),
+            name="likes",
+        ).data(likes)
+        source: Select = (
+            select(pairs.c.user_api_key, pairs.c.tweet_id)
+            .join(Tweet, Tweet.id == pairs.c.tweet_id)
+            .join(User, User.api_key == pairs.c.user_api_key)
+        )
+        inserted: CTE = (
+            insert(TweetLike)
+            .from_select(["user_api_key", "tweet_id"], source)
+            .on_conflict_do_nothing(index_elements=["user_api_key", "tweet_id"])
+            .returning(TweetLike.tweet_id)
+            .cte("inserted")
+        )
+        added: Subquery = (
+            select(inserted.c.tweet_id, func.count().label("delta"))
+            .group_by(inserted.c.tweet_id)
+            .subquery()
+        )
+        like_stmt: Update = (
+            update(Tweet)
+            .where(Tweet.id == added.c.tweet_id)
+            .values(like_count=Tweet.like_count + added.c.delta)
+            .returning(Tweet.id, added.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+        like_result: Result = await session.execute(like_stmt)
+        deltas.update({row.id: row.delta for row in like_result})
+
+    if unlikes:
+        pairs = values(
+            column("user_api_key", String),
+            column("tweet_id", Integer),
+            name="unlikes",
+        ).data(unlikes)
+        deleted: CTE = (
+            delete(TweetLike)
+            .where(
+                tuple_(TweetLike.user_api_key, TweetLike.tweet_id).in_(
+                    select(pairs.c.user_api_key, pairs.c.tweet_id),
+                ),
+            )
+            .returning(TweetLike.tweet_id)
+            .cte("deleted")
+        )
+        removed: Subquery = (
+            select(deleted.c.tweet_id, func.count().label("delta"))
+            .group_by(deleted.c.tweet_id)
+            .subquery()
+        )
+        unlike_stmt: Update = (
+            update(Tweet)
+            .where(Tweet.id == removed.c.tweet_id)
+            .values(like_count=Tweet.like_count - removed.c.delta)
+            .returning(Tweet.id, removed.c.delta)
+            .execution_options(synchronize_session=False)
+        )
+        unlike_result: Result = await session.execute(unlike_stmt)
+        deltas.subtract({row.id: row.delta for row in unlike_result})
+
+    if deltas:
+        await publish_trending(session, likes=deltas.items())
+
+    await publish_invalidation(session, "feed", older_than=FEED_CACHE_STALENESS)
+    await session.commit()
+
+
+async def get_user_id_by_api_key(
+    session: AsyncSession,
+    api_key: str,
+) -> int | None:
+    """
+    Функция получения id юзера по api-key с кэшированием в памяти процесса.
+    При промахе выполняется узкий SELECT id без загрузки связей
     :param session: AsyncSession
     :param api_key: api-key юзера
-    :return: Объект таблицы User или None
+    :return: id юзера или None
     """
-    stmt: Select = select(User).where(User.api_key == api_key)
+    user_id: int | None = api_key_cache.get(api_key)
+    if user_id is not None:
+        return user_id
+
+    stmt: Select = select(User.id).where(User.api_key == api_key)
     result: Result = await session.execute(stmt)
-    result: Result = result.unique()
-    user: User | None = result.scalar_one_or_none()
+    user_id = result.scalar_one_or_none()
 
-    return user
+    if user_id is not None:
+        api_key_cache.set(api_key, user_id)
 
+    return user_id
 
-async def get_user_with_followers_and_following_by_api_key(
+
+async def get_followers_page(
     session: AsyncSession,
-    api_key: str | None,
-) -> User | None:
+    user_id: int,
+    limit: int,
+    cursor: Tuple[int, ...] | None = None,
+) -> Sequence[Row]:
     """
-    Функция получения юзера с подписчиками и подписками по api-key
+    Функция получения страницы подписчиков юзера, новые подписки первыми.
+    Возвращает на одну запись больше, чем limit, чтобы понять, есть ли
+    следующая страница
     :param session: AsyncSession
-    :param api_key: api-key юзера
-    :return: Объект таблицы User или None
+    :param user_id: id юзера
+    :param limit: Размер страницы
+    :param cursor: Ключ сортировки (id подписки) последней записи предыдущей страницы
+    :return: Последовательность строк (cursor_id, user_id, name)
     """
     stmt: Select = (
-        select(User)
-        .options(selectinload(User.followers))
-        .options(selectinload(User.following))
-        .where(User.api_key == api_key)
+        select(
+            Follower.id.label("cursor_id"),
+            User.id.label("user_id"),
+            User.name,
+        )
+        .join(User, User.api_key == Follower.follower_api_key)
+        .where(Follower.following_id == user_id)
+        .order_by(desc(Follower.id))
+        .limit(limit + 1)
     )
+
+    if cursor is not None:
+        stmt = stmt.where(Follower.id < cursor[0])
+
     result: Result = await session.execute(stmt)
-    result: Result = result.unique()
-    user: User | None = result.scalar_one_or_none()
+    rows: Sequence[Row] = result.all()
 
-    return user
+    return rows
 
 
-async def get_user_with_followers_and_following_by_id(
+async def get_following_page(
     session: AsyncSession,
-    user_id: int | None,
-) -> User | None:
+    user_id: int,
+    limit: int,
+    cursor: Tuple[int, ...] | None = None,
+) -> Sequence[Row]:
     """
-     Функция получения юзера с подписчиками и подписками по id
+    Функция получения страницы подписок юзера, новые подписки первыми.
+    Возвращает на одну запись больше, чем limit, чтобы понять, есть ли
+    следующая страница
     :param session: AsyncSession
     :param user_id: id юзера
-    :return: Объект таблицы User или None
+    :param limit: Размер страницы
+    :param cursor: Ключ сортировки (id подписки) последней записи предыдущей страницы
+    :return: Последовательность строк (cursor_id, user_id, name)
     """
+    api_key: ScalarSelect = (
+        select(User.api_key).where(User.id == user_id).scalar_subquery()
+    )
     stmt: Select = (
-        select(User)
-        .options(selectinload(User.followers))
-        .options(selectinload(User.following))
-        .where(User.id == user_id)
+        select(
+            Follower.id.label("cursor_id"),
+            User.id.label("user_id"),
+            User.name,
+        )
+        .join(User, User.id == Follower.following_id)
+        .where(Follower.follower_api_key == api_key)
+        .order_by(desc(Follower.id))
+        .limit(limit + 1)
     )
+
+    if cursor is not None:
+        stmt = stmt.where(Follower.id < cursor[0])
+
     result: Result = await session.execute(stmt)
-    result: Result = result.unique()
-    user: User | None = result.scalar_one_or_none()
+    rows: Sequence[Row] = result.all()
 
-    return user
+    return rows
 
 
-async def get_user_by_id(
+async def get_user_profile(
+    session: AsyncSession,
+    condition: ColumnElement[bool],
+) -> UserProfile | None:
+    """
+    Функция получения юзера с количеством подписчиков и подписок
+    и первыми страницами их списков
+    :param session: AsyncSession
+    :param condition: Условие выбора юзера
+    :return: UserProfile или None
+    """
+    followers_count: ScalarSelect = (
+        select(func.count())
+        .select_from(Follower)
+        .where(Follower.following_id == User.id)
+        .scalar_subquery()
+    )
+    following_count: ScalarSelect = (
+        select(func.count())
+        .select_from(Follower)
+        .where(Follower.follower_api_key == User.api_key)
+        .scalar_subquery()
+    )
+    stmt: Select = select(
+        User.id,
+        User.name,
+        followers_count,
+        following_count,
+    ).where(condition)
+    result: Result = await session.execute(stmt)
+    row: Row | None = result.one_or_none()
+
+    if row is None:
+        return None
+
+    profile: UserProfile = UserProfile(
+        user=row,
+        followers_count=row[2],
+        following_count=row[3],
+        followers=await get_followers_page(session, row.id, FOLLOW_PAGE_SIZE),
+        following=await get_following_page(session, row.id, FOLLOW_PAGE_SIZE),
+    )
+
+    return profile
+
+
+async def get_user_with_followers_and_following_by_api_key(
+    session: AsyncSession,
+    api_key: str | None,
+) -> UserProfile | None:
+    """
+    Функция получения юзера с подписчиками и подписками по api-key
+    :param session: AsyncSession
+    :param api_key: api-key юзера
+    :return: UserProfile или None
+    """
+    profile: UserProfile | None = await get_user_profile(
+        session,
+        User.api_key == api_key,
+    )
+
+    return profile
+
+
+@single_flight
+async def get_user_with_followers_and_following_by_id(
     session: AsyncSession,
     user_id: int | None,
-) -> User | None:
+) -> UserProfile | None:
+    """
+    Функция получения юзера с подписчиками и подписками по id
+    :param session: AsyncSession
+    :param user_id: id юзера
+    :return: UserProfile или None
+    """
+    profile: UserProfile | None = await get_user_profile(session, User.id == user_id)
+
+    return profile
+
+
+async def check_user_exists(session: AsyncSession, user_id: int) -> bool:
     """
-    Функция получения юзера по id
+    Функция проверки существования юзера по id
     :param session: AsyncSession
     :param user_id: id юзера
-    :return: Объект таблицы User или None
+    :return: Логический результат
     """
-    stmt: Select = select(User).where(User.id == user_id)
+    stmt: Select = select(User.id).where(User.id == user_id)
     result: Result = await session.execute(stmt)
-    result: Result = result.unique()
-    user: User | None = result.scalar_one_or_none()
 
-    return user
+    return result.scalar_one_or_none() is not None
 
 
 async def follow_by_user_id(
@@ -276,23 +1112,37 @@ async def follow_by_user_id(
     follower_api_key: str | None,
 ) -> bool:
     """
-    Функция подписки на юзера по id
+    Функция подписки на юзера по id одним запросом с ON CONFLICT DO NOTHING.
+    Повторная подписка ничего не меняет и не вызывает ошибку
     :param session: AsyncSession
     :param user_id: id того, на кого подписываемся
     :param follower_api_key: api-key подписчика
-    :return: Логический результат
+    :return: Логический результат (False, если юзера нет)
     """
-    following: User | None = await get_user_by_id(session, user_id)
+    follower = aliased(User)
+    source: Select = (
+        select(follower.api_key, User.id)
+        .join(User, User.id == user_id)
+        .where(follower.api_key == follower_api_key)
+    )
+    inserted: CTE = (
+        insert(Follower)
+        .from_select(["follower_api_key", "following_id"], source)
+        .on_conflict_do_nothing(index_elements=["follower_api_key", "following_id"])
+        .returning(Follower.id)
+        .cte("inserted")
+    )
+    # CTE попадает в WITH, только если на него есть ссылка в запросе
+    stmt: Select = select(
+        exists(source).label("found"),
+        exists(select(inserted.c.id)).label("followed"),
+    )
 
-    if following:
-        new_follow = Follower(
-            follower_api_key=follower_api_key, following_id=following.id
-        )
-        session.add(new_follow)
-        await session.commit()
-        return True
+    result: Result = await session.execute(stmt)
+    row: Row = result.one()
+    await session.commit()
 
-    return False
+    return row.found
 
 
 async def unfollow_by_user_id(
@@ -301,7 +1151,8 @@ async def unfollow_by_user_id(
     follower_api_key: str | None,
 ) -> bool:
     """
-    Функция отписки от юзера по id
+    Функция отписки от юзера по id.
+    Твиты того, от кого отписались, убираются из ленты подписчика
     :param session: AsyncSession
     :param user_id: id того, на кого подписывались
     :param follower_api_key: api-key подписчика
@@ -314,6 +1165,19 @@ async def unfollow_by_user_id(
 
     result: CursorResult = await session.execute(stmt)
     if result.rowcount > 0:
+        follower_id: Select = select(User.id).where(
+            User.api_key == follower_api_key,
+        )
+        unfollowed_tweets: Select = (
+            select(Tweet.id)
+            .join(User, User.api_key == Tweet.author_api_key)
+            .where(User.id == user_id)
+        )
+        prune_stmt: Delete = delete(TimelineEntry).where(
+            (TimelineEntry.user_id == follower_id.scalar_subquery())
+            & (TimelineEntry.tweet_id.in_(unfollowed_tweets)),
+        )
+        await session.execute(prune_stmt)
         await session.commit()
         return True
 
@@ -334,6 +1198,7 @@ async def create_user_by_schema(
     new_user: User = User(api_key=user.api_key, name=user.name)
 
     session.add(new_user)
+    await publish_invalidation(session, "api_key", [new_user.api_key])
     await session.commit()
 
     return new_user
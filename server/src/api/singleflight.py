@@ -0,0 +1,93 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import async_session
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Группа объединения одинаковых одновременных запросов:
+    вызовы с одним ключом ждут один выполняющийся запрос и получают его результат
+    """
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.coalesced: int = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Метод выполнения запроса или присоединения к уже выполняющемуся
+        :param key: Ключ запроса
+        :param func: Функция запроса
+        :return: Результат запроса
+        """
+        task: asyncio.Task | None = self._in_flight.get(key)
+
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # Отмена одного из ожидающих не отменяет запрос для остальных
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Метод получения статистики группы
+        :return: Словарь с числом запросов в БД, объединенных вызовов
+        и выполняющихся запросов
+        """
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+single_flight_group: SingleFlight = SingleFlight()
+
+
+def single_flight(
+    func: Callable[..., Awaitable[T]],
+) -> Callable[..., Awaitable[T]]:
+    """
+    Декоратор функции чтения сервиса. Ключ строится по имени функции
+    и аргументам без сессии. Общий запрос выполняется в собственной сессии,
+    а не в сессии первого вызова: отмена запроса первого вызова не обрывает
+    запрос для остальных. Функция должна возвращать данные, не привязанные
+    к сессии (строки, кортежи), а не ORM-объекты
+    :param func: Асинхронная функция вида func(session, *args, **kwargs)
+    :return: Обернутая функция
+    """
+
+    async def run(*args: Any, **kwargs: Any) -> T:
+        async with async_session() as session:
+            return await func(session, *args, **kwargs)
+
+    @functools.wraps(func)
+    async def wrapper(session: AsyncSession, *args: Any, **kwargs: Any) -> T:
+        key: Hashable = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+        return await single_flight_group.do(key, lambda: run(*args, **kwargs))
+
+    return wrapper
+
+
+def without_single_flight(
+    func: Callable[..., Awaitable[T]],
+) -> Callable[..., Awaitable[T]]:
+    """
+    Функция получения исходной функции чтения без объединения вызовов,
+    для чтения, которое должно начаться после собственной записи
+    :param func: Функция, обернутая декоратором single_flight
+    :return: Исходная функция вида func(session, *args, **kwargs)
+    """
+    return getattr(func, "__wrapped__", func)
@@ -0,0 +1,291 @@
+import asyncio
+import heapq
+import time
+from collections import Counter
+from typing import (
+    Any,
+    Counter as CounterType,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Tuple,
+    TypeVar,
+)
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import (
+    TRENDING_WINDOW_HOURS,
+    TRENDING_TOP_K,
+    TRENDING_REFRESH_INTERVAL,
+    TRENDING_CHANNEL,
+)
+from .invalidation import (
+    NOTIFY_MAX_BYTES,
+    SENDER_ID,
+    encode_message,
+    publish_messages,
+    register_channel,
+)
+
+K = TypeVar("K", bound=Hashable)
+
+
+class SlidingWindowCounter(Generic[K]):
+    """
+    Счетчик событий за скользящее окно. События копятся в минутных
+    корзинах, минутные корзины старше часа сворачиваются в часовые,
+    часовые корзины старше окна удаляются. Память ограничена 60 минутными
+    и window_hours часовыми корзинами
+    """
+
+    def __init__(self, window_hours: int) -> None:
+        self.window_hours: int = window_hours
+        self._minutes: Dict[int, CounterType[K]] = {}
+        self._hours: Dict[int, CounterType[K]] = {}
+
+    def add(self, key: K, amount: int = 1, now: float | None = None) -> None:
+        """
+        Метод учета события
+        :param key: Ключ счетчика (id твита, хэштег)
+        :param amount: Приращение, отрицательное при отмене события
+        :param now: Время события в секундах, по умолчанию текущее
+        """
+        minute: int = self._roll(now)
+        self._minutes.setdefault(minute, Counter())[key] += amount
+
+    def discard(self, key: K) -> None:
+        """
+        Метод удаления ключа из всех корзин
+        :param key: Ключ счетчика
+        """
+        for bucket in (*self._minutes.values(), *self._hours.values()):
+            bucket.pop(key, None)
+
+    def totals(self, now: float | None = None) -> CounterType[K]:
+        """
+        Метод получения сумм по ключам за окно
+        :param now: Текущее время в секундах
+        :return: Counter сумм по ключам
+        """
+        self._roll(now)
+        totals: CounterType[K] = Counter()
+
+        for bucket in (*self._minutes.values(), *self._hours.values()):
+            totals.update(bucket)
+
+        return totals
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Метод получения статистики счетчика
+        :return: Словарь с числом минутных и часовых корзин
+        """
+        return {
+            "minute_buckets": len(self._minutes),
+            "hour_buckets": len(self._hours),
+        }
+
+    def _roll(self, now: float | None) -> int:
+        """
+        Метод сворачивания минутных корзин в часовые и удаления устаревших
+        :param now: Текущее время в секундах
+        :return: Номер текущей минуты
+        """
+        minute: int = int((time.time() if now is None else now) // 60)
+
+        for old in [m for m in self._minutes if m <= minute - 60]:
+            self._hours.setdefault(old // 60, Counter()).update(self._minutes.pop(old))
+
+        for old in [h for h in self._hours if h < minute // 60 - self.window_hours]:
+            del self._hours[old]
+
+        return minute
+
+
+class TrendingService:
+    """
+    Сервис популярного за окно: счетчики лайков по твитам и использования
+    хэштегов обновляются после коммита записи и по уведомлениям от других
+    воркеров, топ-K пересчитывается в фоне раз в TRENDING_REFRESH_INTERVAL
+    секунд, запросы отдают готовые списки. Счетчики хранятся в памяти
+    процесса и заполняются заново после рестарта
+    """
+
+    def __init__(self, window_hours: int, top_k: int, interval: float) -> None:
+        self.top_k: int = top_k
+        self.interval: float = interval
+        self.likes: SlidingWindowCounter[int] = SlidingWindowCounter(window_hours)
+        self.hashtags: SlidingWindowCounter[str] = SlidingWindowCounter(window_hours)
+        self.top_tweets: List[Tuple[int, int]] = []
+        self.top_hashtags: List[Tuple[str, int]] = []
+        self.refreshes: int = 0
+        self._task: asyncio.Task | None = None
+
+    def apply(self, message: Dict[str, Any]) -> None:
+        """
+        Метод применения приращений счетчиков из сообщения
+        :param message: Сообщение с id удаленных твитов и приращениями
+        лайков по твитам и использования хэштегов
+        """
+        for tweet_id in message["forget"]:
+            self.likes.discard(tweet_id)
+
+        for tweet_id, amount in message["likes"]:
+            self.likes.add(tweet_id, amount)
+
+        for tag, amount in message["hashtags"]:
+            self.hashtags.add(tag, amount)
+
+    def refresh(self, now: float | None = None) -> None:
+        """
+        Метод пересчета топ-K твитов и хэштегов по суммам за окно
+        :param now: Текущее время в секундах
+        """
+        self.top_tweets = top_k(self.likes.totals(now), self.top_k)
+        self.top_hashtags = top_k(self.hashtags.totals(now), self.top_k)
+        self.refreshes += 1
+
+    def start(self) -> None:
+        """Метод запуска периодического пересчета в фоновой задаче"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Метод остановки периодического пересчета"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, int | float]:
+        """
+        Метод получения статистики сервиса
+        :return: Словарь с числом пересчетов и корзин счетчиков
+        """
+        likes: Dict[str, int] = self.likes.stats()
+        hashtags: Dict[str, int] = self.hashtags.stats()
+        return {
+            "refreshes": self.refreshes,
+            "like_buckets": likes["minute_buckets"] + likes["hour_buckets"],
+            "hashtag_buckets": hashtags["minute_buckets"] + hashtags["hour_buckets"],
+        }
+
+    async def _run(self) -> None:
+        """Метод цикла периодического пересчета"""
+        while True:
+            self.refresh()
+            await asyncio.sleep(self.interval)
+
+
+def build_trending_update(
+    likes: Iterable[Tuple[int, int]] = (),
+    hashtags: Iterable[Tuple[str, int]] = (),
+    forget: Iterable[int] = (),
+) -> Dict[str, Any]:
+    """
+    Функция построения сообщения с приращениями счетчиков популярного
+    :param likes: Пары (id твита, приращение лайков)
+    :param hashtags: Пары (хэштег, приращение использования)
+    :param forget: id удаленных твитов
+    :return: Сообщение
+    """
+    return {
+        "likes": [list(pair) for pair in likes],
+        "hashtags": [list(pair) for pair in hashtags],
+        "forget": list(forget),
+        "sender": SENDER_ID,
+    }
+
+
+async def publish_trending(
+    session: AsyncSession,
+    likes: Iterable[Tuple[int, int]] = (),
+    hashtags: Iterable[Tuple[str, int]] = (),
+    forget: Iterable[int] = (),
+) -> None:
+    """
+    Функция публикации приращений счетчиков в текущей транзакции.
+    Как и инвалидация кэша, NOTIFY доставляется другим воркерам только
+    после COMMIT, в своем процессе счетчики обновляются после коммита сессии
+    :param session: AsyncSession
+    :param likes: Пары (id твита, приращение лайков)
+    :param hashtags: Пары (хэштег, приращение использования)
+    :param forget: id удаленных твитов
+    """
+    messages: List[Dict[str, Any]] = split_trending_update(likes, hashtags, forget)
+    await publish_messages(session, TRENDING_CHANNEL, messages)
+
+
+def split_trending_update(
+    likes: Iterable[Tuple[int, int]] = (),
+    hashtags: Iterable[Tuple[str, int]] = (),
+    forget: Iterable[int] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Функция построения сообщений с приращениями счетчиков, payload каждого
+    из которых не длиннее NOTIFY_MAX_BYTES. Удаленные твиты попадают
+    в сообщения раньше приращений
+    :param likes: Пары (id твита, приращение лайков)
+    :param hashtags: Пары (хэштег, приращение использования)
+    :param forget: id удаленных твитов
+    :return: Список сообщений
+    """
+    empty_size: int = len(encode_message(build_trending_update()))
+    messages: List[Dict[str, Any]] = [build_trending_update()]
+    size: int = empty_size
+
+    fields: List[Tuple[str, Iterable[Any]]] = [
+        ("forget", forget),
+        ("likes", (list(pair) for pair in likes)),
+        ("hashtags", (list(pair) for pair in hashtags)),
+    ]
+    for field, values in fields:
+        for value in values:
+            # Элемент и запятая перед ним
+            value_size: int = len(encode_message(value)) + 1
+            if size + value_size > NOTIFY_MAX_BYTES and size > empty_size:
+                messages.append(build_trending_update())
+                size = empty_size
+
+            messages[-1][field].append(value)
+            size += value_size
+
+    return messages
+
+
+def apply_trending(message: Dict[str, Any]) -> None:
+    """
+    Функция применения приращений счетчиков к сервису процесса.
+    Нераспознанные сообщения отбрасываются: счетчики популярного приблизительны
+    :param message: Сообщение с приращениями счетчиков
+    """
+    trending.apply(message)
+
+
+def top_k(totals: CounterType[K], k: int) -> List[Tuple[K, int]]:
+    """
+    Функция выбора k ключей с наибольшими положительными суммами через кучу
+    :param totals: Суммы по ключам
+    :param k: Размер топа
+    :return: Список пар (ключ, сумма) по убыванию суммы
+    """
+    largest: List[Tuple[int, K]] = heapq.nlargest(
+        k,
+        ((count, key) for key, count in totals.items() if count > 0),
+    )
+    return [(key, count) for count, key in largest]
+
+
+trending: TrendingService = TrendingService(
+    window_hours=TRENDING_WINDOW_HOURS,
+    top_k=TRENDING_TOP_K,
+    interval=TRENDING_REFRESH_INTERVAL,
+)
+
+register_channel(TRENDING_CHANNEL, apply_trending)
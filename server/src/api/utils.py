@@ -1,12 +1,45 @@
+import base64
+import binascii
+import hashlib
+import json
+import math
+import os
+import re
 import uuid
 
-from typing import Sequence, Tuple
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Sequence,
+    Tuple,
+)
 
 import aiofiles
+import aiofiles.os
 from fastapi import UploadFile
+from sqlalchemy import Row
+from fastapi.responses import (
+    FileResponse,
+    ORJSONResponse,
+    Response,
+    StreamingResponse,
+)
+from pydantic import BaseModel
+from starlette.datastructures import Headers
 
-from src.config import FILE_DIR
-from .models import User, Tweet, Media
+from src.config import (
+    FILE_DIR,
+    MEDIA_MAX_SIZE,
+    MEDIA_CHUNK_SIZE,
+    MEDIA_SERVING_MODE,
+    MEDIA_ACCEL_PREFIX,
+)
+from .models import Tweet, Media
+from .variants import VARIANT_CONTENT_TYPES, build_variant_path
 from .schemas import (
     ResultBase,
     UserOut,
@@ -19,16 +52,50 @@ from .schemas import (
     LikeBase,
     TweetOut,
     MediaOut,
+    MetricsOut,
+    FollowsOut,
+    TrendingOut,
+    TrendingTweetBase,
+    TrendingHashtagBase,
 )
 
 
+MEDIA_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+# Символ # или @ не должен продолжать слово: a@b.com не упоминание
+HASHTAG_PATTERN: re.Pattern = re.compile(r"(?<![\w#])#(\w{1,100})")
+MENTION_PATTERN: re.Pattern = re.compile(r"(?<![\w@])@(\w{1,50})")
+# Границы значений курсора: integer для id и like_count, real для релевантности
+CURSOR_INT_MIN: int = -(2**31)
+CURSOR_INT_MAX: int = 2**31 - 1
+CURSOR_FLOAT_MAX: float = 3.4028234e38
+# Граница id в путях эндпоинтов: колонки id - integer
+ID_MAX: int = 2**31 - 1
+MEDIA_SIGNATURES: Dict[bytes, str] = {
+    b"\x89PNG\r\n\x1a\n": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+}
+
+
+def sniff_content_type(head: bytes) -> str | None:
+    """
+    Функция определения типа файла по сигнатуре в первых байтах
+    :param head: Начало файла
+    :return: Тип контента или None, если формат не поддерживается
+    """
+    for signature, content_type in MEDIA_SIGNATURES.items():
+        if head.startswith(signature):
+            return content_type
+
+    return None
+
+
 def build_create_media_response(media: Media) -> MediaOut:
     """
     Функция построения JSON-ответа файла
-    :param media: Объект таблицы Media
+    :param media: Строка (id, filename, content_type, sha256) файла
     :return: JSON-ответ с результатом и id файла
     """
-    response: MediaOut = MediaOut(
+    response: MediaOut = MediaOut.model_construct(
         result=True,
         media_id=media.id,
     )
@@ -36,13 +103,168 @@ def build_create_media_response(media: Media) -> MediaOut:
     return response
 
 
-def build_get_media_response(media: Media) -> Tuple[str, str]:
+def build_get_media_response(
+    media: Row,
+    size: int | None = None,
+    fmt: str = "jpeg",
+) -> Tuple[str, str, str]:
+    """
+    Функция построения пути, типа контента и ETag файла или его уменьшенной копии.
+    Для файлов, загруженных до перехода на хранение по хешу, ETag строится
+    по id: содержимое файла по id никогда не меняется
+    :param media: Строка (id, filename, content_type, sha256) файла
+    :param size: Максимальная сторона уменьшенной копии или None для оригинала
+    :param fmt: Формат уменьшенной копии
+    :return: Кортеж из пути, типа контента и ETag файла
+    """
+    tag: str = media.sha256 or f"media-{media.id}"
+
+    if size is None:
+        return f"{FILE_DIR}/{media.filename}", media.content_type, f'"{tag}"'
+
+    return (
+        build_variant_path(media.filename, size, fmt),
+        VARIANT_CONTENT_TYPES[fmt],
+        f'"{tag}-{size}.{fmt}"',
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Функция проверки заголовка If-None-Match (слабое сравнение)
+    :param if_none_match: Значение заголовка или None
+    :param etag: ETag файла
+    :return: True, если клиент уже имеет актуальную версию файла
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag.strip('"') in (
+        tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")
+    )
+
+
+def parse_byte_range(range_header: str, size: int) -> Tuple[int, int] | None:
+    """
+    Функция разбора заголовка Range. Поддерживается один диапазон байт,
+    несколько диапазонов и некорректные значения игнорируются
+    :param range_header: Значение заголовка Range
+    :param size: Размер файла в байтах
+    :return: Кортеж из первого и последнего байта диапазона включительно
+    или None, если заголовок нужно проигнорировать
+    :raises ValueError: Если диапазон не пересекается с файлом
+    """
+    unit, _, spec = range_header.partition("=")
+    start_value, separator, end_value = spec.strip().partition("-")
+
+    if unit.strip().lower() != "bytes" or not separator or "," in spec:
+        return None
+
+    if start_value.isdigit():
+        start: int = int(start_value)
+
+        if end_value and (not end_value.isdigit() or int(end_value) < start):
+            return None
+
+        end: int = min(int(end_value), size - 1) if end_value else size - 1
+    elif not start_value and end_value.isdigit():
+        # Суффиксный диапазон: последние N байт файла
+        start, end = max(size - int(end_value), 0), size - 1
+    else:
+        return None
+
+    if start > end or start >= size:
+        raise ValueError("Range not satisfiable")
+
+    return start, end
+
+
+async def iter_file_range(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """
+    Функция потокового чтения диапазона байт файла
+    :param path: Путь файла
+    :param start: Первый байт диапазона
+    :param end: Последний байт диапазона включительно
+    :return: Асинхронный итератор частей файла
+    """
+    remaining: int = end - start + 1
+
+    async with aiofiles.open(path, "rb") as source:
+        await source.seek(start)
+
+        while remaining > 0:
+            chunk: bytes = await source.read(min(MEDIA_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def build_media_file_response(
+    request_headers: Headers,
+    file_path: str,
+    content_type: str,
+    etag: str,
+) -> Response:
     """
-    Функция построения пути и типа контента файла
-    :param media: Объект таблицы Media
-    :return: Кортеж из пути и типа контента файла
+    Функция построения ответа с файлом с учетом условных запросов и Range.
+    Файлы по id неизменяемы, поэтому кэшируются клиентом без перепроверки.
+    В режиме nginx ответ содержит только заголовок X-Accel-Redirect
+    :param request_headers: Заголовки запроса
+    :param file_path: Путь файла
+    :param content_type: Тип контента
+    :param etag: ETag файла
+    :return: 304, 206, 416, X-Accel-Redirect или полный ответ с файлом
+    :raises FileNotFoundError: Если файла нет на диске
     """
-    return f"{FILE_DIR}/{media.filename}", media.content_type
+    headers: Dict[str, str] = {
+        "ETag": etag,
+        "Cache-Control": MEDIA_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if etag_matches(request_headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if MEDIA_SERVING_MODE == "nginx":
+        # Байты и Range отдает nginx из internal-локации, отображенной на FILE_DIR
+        headers["X-Accel-Redirect"] = (
+            f"{MEDIA_ACCEL_PREFIX}{file_path.removeprefix(FILE_DIR)}"
+        )
+        return Response(media_type=content_type, headers=headers)
+
+    stat_result: os.stat_result = await aiofiles.os.stat(file_path)
+    size: int = stat_result.st_size
+    range_header: str | None = request_headers.get("range")
+    if_range: str | None = request_headers.get("if-range")
+
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range: Tuple[int, int] | None = parse_byte_range(range_header, size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                iter_file_range(file_path, start, end),
+                status_code=206,
+                media_type=content_type,
+                headers=headers,
+            )
+
+    return FileResponse(
+        file_path,
+        media_type=content_type,
+        headers=headers,
+        stat_result=stat_result,
+    )
 
 
 def build_create_tweet_response(tweet: Tweet) -> TweetOut:
@@ -51,7 +273,7 @@ def build_create_tweet_response(tweet: Tweet) -> TweetOut:
     :param tweet: Объект таблицы Tweet
     :return: JSON-ответ с результатом и id твита
     """
-    response: TweetOut = TweetOut(
+    response: TweetOut = TweetOut.model_construct(
         result=True,
         tweet_id=tweet.id,
     )
@@ -59,32 +281,183 @@ def build_create_tweet_response(tweet: Tweet) -> TweetOut:
     return response
 
 
-def build_get_tweets_response(tweets: Sequence[Tweet]) -> TweetsOut:
+def encode_cursor(values: Sequence[int | float]) -> str:
+    """
+    Функция построения непрозрачного курсора пагинации из ключа сортировки
+    :param values: Значения ключа сортировки последнего элемента страницы
+    :return: Курсор в виде base64-строки
+    """
+    raw: bytes = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def is_cursor_value(value: Any, kind: type) -> bool:
+    """
+    Функция проверки значения ключа сортировки из курсора: тип и диапазон
+    должны допускать привязку значения к колонке Postgres
+    :param value: Значение из курсора
+    :param kind: Ожидаемый тип (int или float)
+    :return: Логический результат
+    """
+    if isinstance(value, bool):
+        return False
+
+    if kind is float:
+        return (
+            isinstance(value, (int, float))
+            and math.isfinite(value)
+            and abs(value) <= CURSOR_FLOAT_MAX
+        )
+
+    return isinstance(value, int) and CURSOR_INT_MIN <= value <= CURSOR_INT_MAX
+
+
+def decode_cursor(
+    cursor: str,
+    size: int,
+    kinds: Sequence[type] | None = None,
+) -> Tuple[Any, ...] | None:
     """
-    Функция построения JSON-ответа для всех твитов
-    :param tweets: Последовательность твитов
+    Функция разбора курсора пагинации
+    :param cursor: Курсор, полученный клиентом в next_cursor
+    :param size: Ожидаемое количество значений в ключе сортировки
+    :param kinds: Типы значений ключа (int или float), по умолчанию все int
+    :return: Кортеж значений ключа сортировки или None, если курсор невалиден
+    """
+    if kinds is None:
+        kinds = (int,) * size
+
+    try:
+        raw: bytes = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, binascii.Error):
+        return None
+
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(is_cursor_value(value, kind) for value, kind in zip(values, kinds))
+    ):
+        return None
+
+    return tuple(kind(value) for value, kind in zip(values, kinds))
+
+
+def extract_terms(pattern: re.Pattern, content: str) -> List[str]:
+    """
+    Функция извлечения хэштегов или упоминаний из текста твита
+    :param pattern: HASHTAG_PATTERN или MENTION_PATTERN
+    :param content: Текст твита
+    :return: Уникальные термы в нижнем регистре в порядке появления
+    """
+    return list(dict.fromkeys(term.lower() for term in pattern.findall(content)))
+
+
+def hashtag_sort_key(row: Row) -> Tuple[int]:
+    """
+    Функция получения ключа сортировки твита в ленте хэштега
+    :param row: Строка (like_count, id, tweet)
+    :return: Кортеж из id твита
+    """
+    return (row.id,)
+
+
+def feed_sort_key(tweet: Tweet) -> Tuple[int, int]:
+    """
+    Функция получения ключа сортировки твита в общей ленте
+    :param tweet: Объект таблицы Tweet
+    :return: Кортеж из количества лайков и id твита
+    """
+    return tweet.like_count, tweet.id
+
+
+def timeline_sort_key(tweet: Tweet) -> Tuple[int, int]:
+    """
+    Функция получения ключа сортировки твита в ленте подписок
+    :param tweet: Объект таблицы Tweet
+    :return: Кортеж из score записи ленты (равен id твита) и id твита
+    """
+    return tweet.id, tweet.id
+
+
+def search_sort_key(row: Row) -> Tuple[float, int]:
+    """
+    Функция получения ключа сортировки твита в результатах поиска
+    :param row: Строка (like_count, id, tweet, rank)
+    :return: Кортеж из релевантности и id твита
+    """
+    return row.rank, row.id
+
+
+def build_get_tweets_response(
+    tweets: Sequence[Tweet],
+    limit: int,
+    sort_key: Callable[[Tweet], Tuple[int, int]] = feed_sort_key,
+) -> TweetsOut:
+    """
+    Функция построения JSON-ответа для страницы твитов
+    :param tweets: Последовательность твитов, на один больше размера страницы,
+    если есть следующая страница
+    :param limit: Размер страницы
+    :param sort_key: Функция получения ключа сортировки для курсора
     :return: JSON-ответ со ссылками на файлы, автором и лайками твита
+    и курсором следующей страницы
     """
-    response: TweetsOut = TweetsOut(
+    page: Sequence[Tweet] = tweets[:limit]
+    next_cursor: str | None = None
+    if len(tweets) > limit:
+        next_cursor = encode_cursor(sort_key(page[-1]))
+
+    response: TweetsOut = TweetsOut.model_construct(
         result=True,
         tweets=[
-            TweetBase(
+            TweetBase.model_construct(
                 id=t.id,
                 content=t.content,
                 attachments=[f"/api/medias/{a.id}" for a in t.attachments],
-                author=AuthorBase(id=t.author.id, name=t.author.name),
+                author=AuthorBase.model_construct(id=t.author.id, name=t.author.name),
                 likes=[
-                    LikeBase(user_id=like.user.id, name=like.user.name)
+                    LikeBase.model_construct(user_id=like.user.id, name=like.user.name)
                     for like in t.likes
                 ],
             )
-            for t in tweets
+            for t in page
         ],
+        next_cursor=next_cursor,
     )
 
     return response
 
 
+def build_get_tweets_json(
+    rows: Sequence[Row],
+    limit: int,
+    sort_key: Callable[[Any], Tuple[int | float, ...]] = feed_sort_key,
+) -> bytes:
+    """
+    Функция построения JSON-ответа для страницы твитов из JSON твитов,
+    собранных в Postgres. Структура совпадает с TweetsOut
+    :param rows: Строки (like_count, id, tweet), на одну больше размера страницы,
+    если есть следующая страница
+    :param limit: Размер страницы
+    :param sort_key: Функция получения ключа сортировки для курсора
+    :return: JSON-ответ в байтах
+    """
+    page: Sequence[Row] = rows[:limit]
+    next_cursor: str | None = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(sort_key(page[-1]))
+
+    content: str = (
+        '{"result":true,"tweets":['
+        + ",".join(row.tweet for row in page)
+        + '],"next_cursor":'
+        + json.dumps(next_cursor)
+        + "}"
+    )
+    return content.encode()
+
+
 def build_error_response(error_type: str, error_message: str) -> ErrorBase:
     """
     Функция построения ошибочного JSON-ответа
@@ -92,7 +465,7 @@ def build_error_response(error_type: str, error_message: str) -> ErrorBase:
     :param error_message: Сообщение об ошибке
     :return: JSON-ответ с ошибкой
     """
-    response: ErrorBase = ErrorBase(
+    response: ErrorBase = ErrorBase.model_construct(
         result=False,
         error_type=error_type,
         error_message=error_message,
@@ -107,55 +480,231 @@ def build_result_response(result: bool) -> ResultBase:
     :param result: Булево значение
     :return: JSON-ответ с результатом
     """
-    response: ResultBase = ResultBase(
+    response: ResultBase = ResultBase.model_construct(
         result=result,
     )
 
     return response
 
 
-def build_get_user_response(user: User) -> UserOut:
+class UserProfile(NamedTuple):
+    """Юзер с количеством подписчиков и подписок и первыми страницами их списков"""
+
+    user: Row
+    followers_count: int
+    following_count: int
+    followers: Sequence[Row]
+    following: Sequence[Row]
+
+
+def build_follows_page(
+    rows: Sequence[Row],
+    limit: int,
+) -> Tuple[List[FollowBase], str | None]:
+    """
+    Функция построения страницы подписчиков или подписок
+    :param rows: Строки (cursor_id, user_id, name), на одну больше размера
+    страницы, если есть следующая страница
+    :param limit: Размер страницы
+    :return: Кортеж из юзеров страницы и курсора следующей страницы
+    """
+    page: Sequence[Row] = rows[:limit]
+    next_cursor: str | None = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor((page[-1].cursor_id,))
+
+    users: List[FollowBase] = [
+        FollowBase.model_construct(id=row.user_id, name=row.name) for row in page
+    ]
+    return users, next_cursor
+
+
+def build_get_user_response(profile: UserProfile, limit: int) -> UserOut:
     """
     Функция построения JSON-ответа для получения юзера
-    :param user: Объект таблицы User
-    :return: JSON-ответ с подписчиками и подписками юзера
+    :param profile: Юзер с количеством и первыми страницами подписчиков и подписок
+    :param limit: Размер первых страниц
+    :return: JSON-ответ с количеством и первыми страницами подписчиков
+    и подписок юзера
     """
-    response: UserOut = UserOut(
+    followers, followers_next_cursor = build_follows_page(profile.followers, limit)
+    following, following_next_cursor = build_follows_page(profile.following, limit)
+
+    response: UserOut = UserOut.model_construct(
         result=True,
-        user=UserBase(
-            id=user.id,
-            name=user.name,
-            followers=[
-                FollowBase(
-                    id=follower.follower.id,
-                    name=follower.follower.name,
-                )
-                for follower in user.followers
-            ],
-            following=[
-                FollowBase(
-                    id=following.following.id,
-                    name=following.following.name,
-                )
-                for following in user.following
-            ],
+        user=UserBase.model_construct(
+            id=profile.user.id,
+            name=profile.user.name,
+            followers=followers,
+            following=following,
+            followers_count=profile.followers_count,
+            following_count=profile.following_count,
+            followers_next_cursor=followers_next_cursor,
+            following_next_cursor=following_next_cursor,
         ),
     )
 
     return response
 
 
-async def upload_media(file: UploadFile) -> str:
+def build_get_follows_response(rows: Sequence[Row], limit: int) -> FollowsOut:
+    """
+    Функция построения JSON-ответа для страницы подписчиков или подписок
+    :param rows: Строки (cursor_id, user_id, name), на одну больше размера
+    страницы, если есть следующая страница
+    :param limit: Размер страницы
+    :return: JSON-ответ с юзерами и курсором следующей страницы
+    """
+    users, next_cursor = build_follows_page(rows, limit)
+
+    response: FollowsOut = FollowsOut.model_construct(
+        result=True,
+        users=users,
+        next_cursor=next_cursor,
+    )
+
+    return response
+
+
+def build_metrics_response(
+    metrics: Dict[str, Dict[str, int | float]],
+) -> MetricsOut:
+    """
+    Функция построения JSON-ответа с внутренними метриками процесса
+    :param metrics: Словарь метрик по подсистемам
+    :return: JSON-ответ с метриками
+    """
+    response: MetricsOut = MetricsOut.model_construct(
+        result=True,
+        metrics=metrics,
+    )
+
+    return response
+
+
+def build_trending_response(
+    tweets: Sequence[Tuple[int, int]],
+    hashtags: Sequence[Tuple[str, int]],
+) -> TrendingOut:
+    """
+    Функция построения JSON-ответа с популярными твитами и хэштегами
+    :param tweets: Пары (id твита, количество лайков за окно)
+    :param hashtags: Пары (хэштег, количество твитов за окно)
+    :return: JSON-ответ с популярным
+    """
+    response: TrendingOut = TrendingOut.model_construct(
+        result=True,
+        tweets=[
+            TrendingTweetBase.model_construct(id=tweet_id, likes=likes)
+            for tweet_id, likes in tweets
+        ],
+        hashtags=[
+            TrendingHashtagBase.model_construct(tag=tag, count=count)
+            for tag, count in hashtags
+        ],
+    )
+
+    return response
+
+
+class UploadedFile(NamedTuple):
+    """Загруженный во временный файл контент"""
+
+    temp_path: str
+    sha256: str
+    size: int
+    content_type: str
+
+
+def build_blob_path(sha256: str) -> str:
+    """
+    Функция построения пути файла в хранилище, адресуемом по содержимому
+    :param sha256: SHA-256 содержимого файла
+    :return: Путь относительно FILE_DIR вида ab/cd/<hash>
+    """
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+async def upload_media(file: UploadFile) -> UploadedFile | None:
     """
-    Функция генерации уникального имени файла и сохранения файла на диск
+    Функция потоковой записи файла во временный файл частями фиксированного
+    размера с подсчетом SHA-256. Тип файла определяется по сигнатуре,
+    а не по заголовку Content-Type. При превышении MEDIA_MAX_SIZE или
+    неподдерживаемом формате запись прерывается, а частичный файл удаляется
     :param file: Загружаемый файл
-    :return: Уникальное имя файла для последующего сохранения в базу данных
+    :return: UploadedFile или None
     """
-    filename_part: str = file.filename if file.filename else "filename"
-    unique_filename: str = str(uuid.uuid4()) + "_" + filename_part
+    if file.size is not None and file.size > MEDIA_MAX_SIZE:
+        return None
 
-    async with aiofiles.open(f"{FILE_DIR}/{unique_filename}", mode="wb") as f:
-        content: bytes = await file.read()
-        await f.write(content)
+    await aiofiles.os.makedirs(f"{FILE_DIR}/tmp", exist_ok=True)
+    temp_path: str = f"{FILE_DIR}/tmp/{uuid.uuid4()}.part"
 
-    return unique_filename
+    digest = hashlib.sha256()
+    content_type: str | None = None
+    size: int = 0
+    completed: bool = False
+
+    try:
+        async with aiofiles.open(temp_path, mode="wb") as f:
+            while chunk := await file.read(MEDIA_CHUNK_SIZE):
+                if content_type is None:
+                    content_type = sniff_content_type(chunk)
+
+                size += len(chunk)
+                if content_type is None or size > MEDIA_MAX_SIZE:
+                    break
+
+                digest.update(chunk)
+                await f.write(chunk)
+            else:
+                completed = content_type is not None
+    finally:
+        if not completed:
+            await aiofiles.os.remove(temp_path)
+
+    if not completed or content_type is None:
+        return None
+
+    return UploadedFile(temp_path, digest.hexdigest(), size, content_type)
+
+
+async def store_blob(temp_path: str, blob_path: str) -> None:
+    """
+    Функция переноса временного файла в хранилище. Если файл с таким
+    содержимым уже есть, временный файл просто удаляется
+    :param temp_path: Путь временного файла
+    :param blob_path: Путь файла относительно FILE_DIR
+    """
+    file_path: str = f"{FILE_DIR}/{blob_path}"
+
+    if await aiofiles.os.path.exists(file_path):
+        await aiofiles.os.remove(temp_path)
+        return
+
+    await aiofiles.os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    await aiofiles.os.replace(temp_path, file_path)
+
+
+async def remove_file(file_path: str) -> None:
+    """
+    Функция удаления файла, если он существует
+    :param file_path: Путь файла
+    """
+    try:
+        await aiofiles.os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def build_json_response(model: BaseModel, status_code: int = 200) -> ORJSONResponse:
+    """
+    Функция построения ответа из готовой схемы.
+    Схемы собираются через model_construct из уже проверенных данных БД,
+    поэтому ответ отдается напрямую: FastAPI не валидирует его повторно
+    по response_model, а сериализация выполняется один раз через orjson
+    :param model: Схема ответа
+    :param status_code: HTTP-статус
+    :return: ORJSONResponse
+    """
+    return ORJSONResponse(model.model_dump(), status_code=status_code)
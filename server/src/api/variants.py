@@ -0,0 +1,160 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+import aiofiles.os
+from PIL import Image, ImageOps
+
+from src.config import (
+    FILE_DIR,
+    MEDIA_VARIANT_SIZES,
+    MEDIA_VARIANT_FORMATS,
+    MEDIA_VARIANT_WORKERS,
+)
+
+VARIANT_DIR: str = f"{FILE_DIR}/variants"
+VARIANT_CONTENT_TYPES: Dict[str, str] = {
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+# Ошибки декодирования загруженного файла: поврежденное или усеченное
+# содержимое за верной сигнатурой, слишком большое изображение
+VARIANT_DECODE_ERRORS: Tuple[type[Exception], ...] = (
+    OSError,
+    SyntaxError,
+    ValueError,
+    Image.DecompressionBombError,
+)
+
+_executor: ProcessPoolExecutor | None = None
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Функция получения пула процессов для обработки изображений.
+    Пул создается при первом обращении
+    :return: ProcessPoolExecutor
+    """
+    global _executor
+
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=MEDIA_VARIANT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Функция остановки пула процессов"""
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def build_variant_path(filename: str, size: int, fmt: str) -> str:
+    """
+    Функция построения пути уменьшенной копии файла
+    :param filename: Путь исходного файла относительно FILE_DIR
+    :param size: Максимальная сторона в пикселях
+    :param fmt: Формат (webp или jpeg)
+    :return: Путь уменьшенной копии
+    """
+    return f"{VARIANT_DIR}/{filename}_{size}.{fmt}"
+
+
+def render_variant(source_path: str, target_path: str, size: int, fmt: str) -> None:
+    """
+    Функция построения уменьшенной копии изображения.
+    Выполняется в процессе пула, результат атомарно переименовывается
+    :param source_path: Путь исходного файла
+    :param target_path: Путь уменьшенной копии
+    :param size: Максимальная сторона в пикселях
+    :param fmt: Формат (webp или jpeg)
+    """
+    with Image.open(source_path) as source:
+        image: Image.Image = ImageOps.exif_transpose(source)
+        image.thumbnail((size, size))
+
+        if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        temp_path: str = f"{target_path}.{os.getpid()}.tmp"
+        try:
+            image.save(temp_path, format=fmt.upper())
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    os.replace(temp_path, target_path)
+
+
+async def ensure_variant(filename: str, size: int, fmt: str) -> str:
+    """
+    Функция получения уменьшенной копии файла с дисковым кэшем.
+    Отсутствующая копия строится в пуле процессов, параллельные запросы
+    одной и той же копии ждут одно построение
+    :param filename: Путь исходного файла относительно FILE_DIR
+    :param size: Максимальная сторона в пикселях
+    :param fmt: Формат (webp или jpeg)
+    :return: Путь уменьшенной копии
+    """
+    target_path: str = build_variant_path(filename, size, fmt)
+
+    if await aiofiles.os.path.exists(target_path):
+        return target_path
+
+    future: asyncio.Future | None = _in_flight.get(target_path)
+    if future is None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            get_executor(),
+            render_variant,
+            f"{FILE_DIR}/{filename}",
+            target_path,
+            size,
+            fmt,
+        )
+        _in_flight[target_path] = future
+        future.add_done_callback(lambda _: _in_flight.pop(target_path, None))
+
+    await asyncio.shield(future)
+    return target_path
+
+
+async def generate_variants(filename: str) -> None:
+    """
+    Функция построения всех настроенных уменьшенных копий загруженного файла.
+    Ошибки игнорируются: копия будет построена повторно по запросу
+    :param filename: Путь исходного файла относительно FILE_DIR
+    """
+    await asyncio.gather(
+        *(
+            ensure_variant(filename, size, fmt)
+            for size in MEDIA_VARIANT_SIZES
+            for fmt in MEDIA_VARIANT_FORMATS
+        ),
+        return_exceptions=True,
+    )
+
+
+async def remove_variants(filename: str) -> None:
+    """
+    Функция удаления всех уменьшенных копий файла
+    :param filename: Путь исходного файла относительно FILE_DIR
+    """
+    for size in MEDIA_VARIANT_SIZES:
+        for fmt in VARIANT_CONTENT_TYPES:
+            try:
+                await aiofiles.os.remove(build_variant_path(filename, size, fmt))
+            except FileNotFoundError:
+                pass
@@ -1,4 +1,5 @@
 import os
+from typing import Tuple
 
 from dotenv import load_dotenv
 
@@ -16,4 +17,66 @@ TEST_DB_NAME: str | None = os.environ.get("TEST_DB_NAME")
 TEST_DB_USER: str | None = os.environ.get("TEST_DB_USER")
 TEST_DB_PASS: str | None = os.environ.get("TEST_DB_PASS")
 
+DB_USE_NULL_POOL: bool = os.environ.get("DB_USE_NULL_POOL", "false") == "true"
+DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT: float = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE: int = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING: bool = os.environ.get("DB_POOL_PRE_PING", "true") == "true"
+DB_STATEMENT_CACHE_SIZE: int = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+
 FILE_DIR: str = "/static/images"
+MEDIA_MAX_SIZE: int = int(os.environ.get("MEDIA_MAX_SIZE", 5 * 1024 * 1024))
+MEDIA_CHUNK_SIZE: int = int(os.environ.get("MEDIA_CHUNK_SIZE", 64 * 1024))
+MEDIA_VARIANT_SIZES: Tuple[int, ...] = tuple(
+    int(size)
+    for size in os.environ.get("MEDIA_VARIANT_SIZES", "64,320,1080").split(",")
+)
+MEDIA_VARIANT_FORMATS: Tuple[str, ...] = tuple(
+    os.environ.get("MEDIA_VARIANT_FORMATS", "webp,jpeg").split(",")
+)
+MEDIA_VARIANT_WORKERS: int = int(os.environ.get("MEDIA_VARIANT_WORKERS", 2))
+MEDIA_CACHE_SIZE: int = int(os.environ.get("MEDIA_CACHE_SIZE", 10000))
+MEDIA_CACHE_TTL: float = float(os.environ.get("MEDIA_CACHE_TTL", 3600))
+# file - файлы отдает приложение, nginx - только X-Accel-Redirect
+MEDIA_SERVING_MODE: str = os.environ.get("MEDIA_SERVING_MODE", "file")
+MEDIA_ACCEL_PREFIX: str = os.environ.get("MEDIA_ACCEL_PREFIX", "/_media")
+TWEET_MAX_ATTACHMENTS: int = int(os.environ.get("TWEET_MAX_ATTACHMENTS", 4))
+
+FEED_PAGE_SIZE: int = int(os.environ.get("FEED_PAGE_SIZE", 50))
+FEED_MAX_PAGE_SIZE: int = int(os.environ.get("FEED_MAX_PAGE_SIZE", 100))
+# Сборка JSON страницы ленты в Postgres вместо ORM и Pydantic
+FEED_SQL_JSON: bool = os.environ.get("FEED_SQL_JSON", "true") == "true"
+SEARCH_MAX_QUERY_LENGTH: int = int(os.environ.get("SEARCH_MAX_QUERY_LENGTH", 256))
+FOLLOW_PAGE_SIZE: int = int(os.environ.get("FOLLOW_PAGE_SIZE", 50))
+FOLLOW_MAX_PAGE_SIZE: int = int(os.environ.get("FOLLOW_MAX_PAGE_SIZE", 100))
+EXPORT_BATCH_SIZE: int = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+FEED_CACHE_SIZE: int = int(os.environ.get("FEED_CACHE_SIZE", 256))
+FEED_CACHE_TTL: float = float(os.environ.get("FEED_CACHE_TTL", 60))
+# Допустимое отставание страниц ленты от лайков, чтобы серия лайков
+# не вызывала перестроение кэша на каждый запрос
+FEED_CACHE_STALENESS: float = float(os.environ.get("FEED_CACHE_STALENESS", 5))
+# Отложенная пакетная запись лайков: сброс раз в LIKE_BUFFER_INTERVAL секунд
+# или при накоплении LIKE_BUFFER_MAX_ITEMS пар (юзер, твит)
+LIKE_BUFFER_ENABLED: bool = os.environ.get("LIKE_BUFFER_ENABLED", "false") == "true"
+LIKE_BUFFER_INTERVAL: float = float(os.environ.get("LIKE_BUFFER_INTERVAL", 0.2))
+LIKE_BUFFER_MAX_ITEMS: int = int(os.environ.get("LIKE_BUFFER_MAX_ITEMS", 1000))
+# Популярное за последние TRENDING_WINDOW_HOURS часов, топ пересчитывается
+# раз в TRENDING_REFRESH_INTERVAL секунд
+TRENDING_WINDOW_HOURS: int = int(os.environ.get("TRENDING_WINDOW_HOURS", 24))
+TRENDING_TOP_K: int = int(os.environ.get("TRENDING_TOP_K", 10))
+TRENDING_REFRESH_INTERVAL: float = float(
+    os.environ.get("TRENDING_REFRESH_INTERVAL", 10)
+)
+# Приращения счетчиков рассылаются остальным воркерам через NOTIFY
+TRENDING_CHANNEL: str = os.environ.get("TRENDING_CHANNEL", "trending_update")
+
+API_KEY_CACHE_SIZE: int = int(os.environ.get("API_KEY_CACHE_SIZE", 10000))
+API_KEY_CACHE_TTL: float = float(os.environ.get("API_KEY_CACHE_TTL", 300))
+
+INVALIDATION_LISTEN: bool = os.environ.get("INVALIDATION_LISTEN", "true") == "true"
+INVALIDATION_CHANNEL: str = os.environ.get("INVALIDATION_CHANNEL", "cache_invalidation")
+INVALIDATION_KEEPALIVE: float = float(os.environ.get("INVALIDATION_KEEPALIVE", 30))
+INVALIDATION_RECONNECT_DELAY: float = float(
+    os.environ.get("INVALIDATION_RECONNECT_DELAY", 1)
+)
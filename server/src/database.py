@@ -1,6 +1,6 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Any, Dict
 
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, QueuePool
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
@@ -14,16 +14,67 @@ from .config import (
     DB_HOST,
     DB_PORT,
     DB_NAME,
+    DB_USE_NULL_POOL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
 )
 from src.api.models import Base
 
 DATABASE_URL: str = (
     f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
-engine: AsyncEngine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+
+
+def get_engine_options() -> Dict[str, Any]:
+    """
+    Функция построения параметров движка из конфигурации.
+    NullPool включается явно через DB_USE_NULL_POOL (например, для тестов)
+    :return: Словарь именованных аргументов для create_async_engine
+    """
+    connect_args: Dict[str, int] = {
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+
+    if DB_USE_NULL_POOL:
+        return {"poolclass": NullPool, "connect_args": connect_args}
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+engine: AsyncEngine = create_async_engine(DATABASE_URL, **get_engine_options())
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 
+def get_pool_stats() -> Dict[str, int]:
+    """
+    Функция получения текущего состояния пула соединений
+    :return: Словарь с размером пула, свободными, занятыми
+    и сверхлимитными соединениями
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
 async def create_db_and_tables() -> None:
     """Создание таблиц базы данных"""
     async with engine.begin() as conn:
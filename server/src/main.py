@@ -2,23 +2,42 @@ from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, Response
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
-from src.api.models import User
+from src.api.invalidation import invalidation_listener
+from src.api.likes_buffer import like_buffer
+from src.api.trending import trending
 from src.api.router import router
-from src.api.service import get_user_by_api_key
+from src.api.service import get_user_id_by_api_key
+from src.api.variants import shutdown_executor
 
-from .database import async_session, create_db_and_tables
+from .config import INVALIDATION_LISTEN, LIKE_BUFFER_ENABLED
+from .database import async_session, create_db_and_tables, engine
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_db_and_tables()
+    if INVALIDATION_LISTEN:
+        invalidation_listener.start()
+    if LIKE_BUFFER_ENABLED:
+        like_buffer.start()
+    trending.start()
     yield
-
-
-app: FastAPI = FastAPI(title="Twitter API", lifespan=lifespan)
+    await trending.stop()
+    # Буфер лайков сбрасывается до закрытия пула соединений
+    await like_buffer.stop()
+    await invalidation_listener.stop()
+    shutdown_executor()
+    await engine.dispose()
+
+
+app: FastAPI = FastAPI(
+    title="Twitter API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.include_router(router)
 
 app.mount("/static", StaticFiles(directory="/static"), name="static")
@@ -38,8 +57,8 @@ async def check_user_api_key_middleware(request: Request, call_next):
 
     if api_key is not None:
         async with async_session() as session:
-            user: User | None = await get_user_by_api_key(session, api_key)
-            if user is None:
+            user_id: int | None = await get_user_id_by_api_key(session, api_key)
+            if user_id is None:
                 raise HTTPException(status_code=401, detail="Invalid API Key")
 
     response: Response = await call_next(request)
@@ -0,0 +1,5 @@
+import os
+
+# Пул соединений привязан к циклу событий, а pytest-asyncio создает новый цикл
+# на каждый тест, поэтому приложение в тестах работает без пула
+os.environ["DB_USE_NULL_POOL"] = "true"
@@ -1,7 +1,9 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Generator, List
 
 import pytest
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
 from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
@@ -62,6 +64,25 @@ async def ac() -> AsyncGenerator[AsyncClient, None]:
         yield ac
 
 
+@pytest.fixture
+def no_lazy_loads() -> Generator[List[str], None, None]:
+    """
+    Фикстура, проваливающая тест, если эндпоинт подгрузил связь ORM лениво,
+    а не через профиль загрузки
+    """
+    lazy_loads: List[str] = []
+
+    def on_execute(state: ORMExecuteState) -> None:
+        if state.is_select and state.lazy_loaded_from is not None:
+            lazy_loads.append(state.lazy_loaded_from.mapper.class_.__name__)
+
+    event.listen(Session, "do_orm_execute", on_execute)
+    yield lazy_loads
+    event.remove(Session, "do_orm_execute", on_execute)
+
+    assert not lazy_loads, f"Unexpected lazy loads from: {lazy_loads}"
+
+
 async def create_test_db_and_tables() -> None:
     """Создание таблиц базы данных для тестирования"""
     async with test_engine.begin() as conn:
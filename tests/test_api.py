@@ -1,7 +1,41 @@
-from typing import Dict, Any, List
+import asyncio
+import hashlib
+import io
+import json
+import os
+from typing import Awaitable, Callable, Dict, Any, List, Sequence
 
+import asyncpg
 import pytest
 from httpx import AsyncClient, Response
+from PIL import Image
+from sqlalchemy import Row, select
+
+from server.src.api.models import Mention, Tweet, TweetMention
+from server.src.api.schemas import TweetBase
+from server.src.api.utils import (
+    build_get_tweets_json,
+    build_get_tweets_response,
+    encode_cursor,
+    UserProfile,
+)
+from server.src.api.trending import SlidingWindowCounter, TrendingService
+from server.src.database import async_session
+from server.src.config import FILE_DIR, INVALIDATION_CHANNEL, TRENDING_CHANNEL
+from src.api import likes_buffer as app_likes_buffer, router as app_router
+from src.api.cache import feed_cache, invalidate
+from src.api.invalidation import (
+    InvalidationListener,
+    LISTEN_DSN,
+    build_invalidation,
+    handle_notification,
+)
+from src.api.service import (
+    get_all_tweets,
+    get_all_tweets_json,
+    get_user_with_followers_and_following_by_id,
+)
+from src.api.singleflight import single_flight_group
 
 
 @pytest.mark.asyncio
@@ -19,6 +53,41 @@ async def test_create_medias(ac: AsyncClient) -> None:
     assert "media_id" in data
 
 
+@pytest.mark.asyncio
+async def test_create_medias_invalid_signature(ac: AsyncClient) -> None:
+    """
+    Тестирование отказа в загрузке файла, не являющегося изображением,
+    по эндпоинту POST /api/medias
+    """
+    files = {"file": ("fake.png", b"definitely not a png", "image/png")}
+    response: Response = await ac.post("/medias", files=files)
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_create_medias_too_large(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование отказа в загрузке слишком большого файла
+    по эндпоинту POST /api/medias
+    """
+    monkeypatch.setattr("src.api.utils.MEDIA_MAX_SIZE", 16)
+    monkeypatch.setattr("src.api.utils.MEDIA_CHUNK_SIZE", 8)
+    files_before: List[str] = sorted(os.listdir(FILE_DIR))
+
+    with open("tests/test_files/test_image_1.png", mode="rb") as file:
+        response: Response = await ac.post(
+            "/medias",
+            files={"file": ("big.png", file.read(), "image/png")},
+        )
+
+    assert response.status_code == 400
+    assert sorted(os.listdir(FILE_DIR)) == files_before
+
+
 @pytest.mark.asyncio
 async def test_get_medias(ac: AsyncClient) -> None:
     """Тестирование получения файла по эндпоинту GET /api/medias"""
@@ -29,6 +98,147 @@ async def test_get_medias(ac: AsyncClient) -> None:
     assert response.headers["Content-Type"].startswith("image/")
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["webp", "jpeg"])
+async def test_get_medias_variant(ac: AsyncClient, fmt: str) -> None:
+    """
+    Тестирование получения уменьшенной копии файла
+    по эндпоинту GET /api/medias/{id}?size=&format=
+    """
+    response: Response = await ac.get(
+        "/medias/1",
+        params={"size": 64, "format": fmt},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == f"image/{fmt}"
+    with Image.open(io.BytesIO(response.content)) as image:
+        assert max(image.size) == 64
+
+
+@pytest.mark.asyncio
+async def test_get_medias_unsupported_variant(ac: AsyncClient) -> None:
+    """
+    Тестирование запроса неподдерживаемого размера
+    по эндпоинту GET /api/medias/{id}?size=
+    """
+    response: Response = await ac.get("/medias/1", params={"size": 65})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_medias_not_modified(ac: AsyncClient) -> None:
+    """
+    Тестирование условного запроса файла
+    по эндпоинту GET /api/medias/{id} с заголовком If-None-Match
+    """
+    response: Response = await ac.get("/medias/1")
+    etag: str = response.headers["ETag"]
+
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    response = await ac.get("/medias/1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_get_medias_range(ac: AsyncClient) -> None:
+    """
+    Тестирование запроса части файла
+    по эндпоинту GET /api/medias/{id} с заголовком Range
+    """
+    with open("tests/test_files/test_image_1.png", mode="rb") as file:
+        content: bytes = file.read()
+
+    response: Response = await ac.get("/medias/1", headers={"Range": "bytes=0-7"})
+
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 0-7/{len(content)}"
+    assert response.content == content[:8]
+
+    response = await ac.get("/medias/1", headers={"Range": "bytes=-4"})
+
+    assert response.status_code == 206
+    assert response.content == content[-4:]
+
+    response = await ac.get(
+        "/medias/1",
+        headers={"Range": f"bytes={len(content)}-"},
+    )
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(content)}"
+
+
+@pytest.mark.asyncio
+async def test_get_medias_accel_redirect(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование отдачи файла через nginx
+    по эндпоинту GET /api/medias/{id} в режиме X-Accel-Redirect
+    """
+    monkeypatch.setattr("src.api.utils.MEDIA_SERVING_MODE", "nginx")
+
+    response: Response = await ac.get("/medias/1")
+    redirect: str = response.headers["X-Accel-Redirect"]
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["Content-Type"] == "image/png"
+    assert redirect.startswith("/_media/")
+    assert os.path.exists(f"{FILE_DIR}/{redirect.removeprefix('/_media/')}")
+
+
+@pytest.mark.asyncio
+async def test_create_medias_deduplicated(ac: AsyncClient) -> None:
+    """
+    Тестирование хранения одинаковых файлов в одном блобе
+    по эндпоинтам POST /api/medias и GET /api/medias/{id}
+    """
+    with open("tests/test_files/test_image_1.png", mode="rb") as file:
+        content: bytes = file.read()
+
+    response: Response = await ac.post("/medias", files={"file": content})
+    assert response.status_code == 201
+    assert response.json()["media_id"] == 2
+
+    sha256: str = hashlib.sha256(content).hexdigest()
+    for media_id in (1, 2):
+        response = await ac.get(f"/medias/{media_id}")
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] == f'"{sha256}"'
+
+    assert os.path.exists(f"{FILE_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}")
+
+
+@pytest.mark.asyncio
+async def test_get_medias_variant_corrupt(ac: AsyncClient) -> None:
+    """
+    Тестирование запроса уменьшенной копии усеченного PNG с верной сигнатурой
+    по эндпоинту GET /api/medias/{id}?size=
+    """
+    with open("tests/test_files/test_image_1.png", mode="rb") as file:
+        content: bytes = file.read()[:200]
+
+    response: Response = await ac.post(
+        "/medias",
+        files={"file": ("truncated.png", content, "image/png")},
+    )
+    media_id: int = response.json()["media_id"]
+
+    response = await ac.get(f"/medias/{media_id}", params={"size": 64})
+
+    assert response.status_code == 422
+    assert (await ac.get(f"/medias/{media_id}")).status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_create_tweet(ac: AsyncClient) -> None:
     """Тестирование создания твита по эндпоинту POST /api/tweets"""
@@ -44,6 +254,29 @@ async def test_create_tweet(ac: AsyncClient) -> None:
     assert "tweet_id" in data
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "media_ids",
+    [[1], [999], [1, 2, 3, 4, 5]],
+    ids=["already_attached", "unknown", "too_many"],
+)
+async def test_create_tweet_invalid_media(
+    ac: AsyncClient,
+    media_ids: List[int],
+) -> None:
+    """
+    Тестирование отказа в создании твита с недоступными файлами
+    по эндпоинту POST /api/tweets
+    """
+    json_data: Dict[str, List[int] | str] = {
+        "tweet_data": "Invalid tweet",
+        "tweet_media_ids": media_ids,
+    }
+    response: Response = await ac.post("/tweets", json=json_data)
+
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_like_tweet(ac: AsyncClient) -> None:
     """
@@ -59,7 +292,34 @@ async def test_like_tweet(ac: AsyncClient) -> None:
 
 
 @pytest.mark.asyncio
-async def test_get_tweets(ac: AsyncClient) -> None:
+async def test_like_tweet_idempotent(ac: AsyncClient) -> None:
+    """
+    Тестирование повторных и одновременных лайков
+    по эндпоинту POST /api/tweets/{id}/likes
+    """
+    responses: List[Response] = await asyncio.gather(
+        *(ac.post("/tweets/1/likes") for _ in range(3)),
+    )
+    export: Response = await ac.get("/tweets/export")
+    tweet: Dict[str, Any] = json.loads(export.text.splitlines()[0])
+
+    async with async_session() as session:
+        like_count: int | None = await session.scalar(
+            select(Tweet.like_count).where(Tweet.id == 1),
+        )
+
+    assert like_count is not None
+    assert [r.status_code for r in responses] == [201, 201, 201]
+    assert tweet["likes"] == [{"user_id": 1, "name": "Tony"}]
+    assert like_count == 1
+
+    response: Response = await ac.post("/tweets/100/likes")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_tweets(ac: AsyncClient, no_lazy_loads: List[str]) -> None:
     """Тестирование получения всех твитов по эндпоинту GET /api/tweets"""
     expected: Dict[str, Any] = {
         "result": True,
@@ -72,6 +332,7 @@ async def test_get_tweets(ac: AsyncClient) -> None:
                 "likes": [{"user_id": 1, "name": "Tony"}],
             }
         ],
+        "next_cursor": None,
     }
 
     response: Response = await ac.get("/tweets")
@@ -81,6 +342,287 @@ async def test_get_tweets(ac: AsyncClient) -> None:
     assert data == expected
 
 
+@pytest.mark.asyncio
+async def test_get_tweets_pagination(ac: AsyncClient) -> None:
+    """
+    Тестирование постраничного получения твитов
+    по эндпоинту GET /api/tweets?limit=&cursor=
+    """
+    response: Response = await ac.post("/tweets", json={"tweet_data": "Second"})
+    assert response.status_code == 201
+
+    response = await ac.get("/tweets", params={"limit": 1})
+    first_page: Dict[str, Any] = response.json()
+
+    assert response.status_code == 200
+    assert [t["id"] for t in first_page["tweets"]] == [1]
+    assert first_page["next_cursor"] is not None
+
+    response = await ac.get(
+        "/tweets",
+        params={"limit": 1, "cursor": first_page["next_cursor"]},
+    )
+    second_page: Dict[str, Any] = response.json()
+
+    assert response.status_code == 200
+    assert [t["id"] for t in second_page["tweets"]] == [2]
+    assert second_page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [1, 50])
+async def test_get_tweets_json_matches_orm(limit: int) -> None:
+    """
+    Тестирование совпадения страницы ленты, собранной в Postgres,
+    со страницей, собранной из ORM-объектов
+    """
+    async with async_session() as session:
+        rows: Sequence[Row] = await get_all_tweets_json(session, limit)
+        tweets: Sequence[Tweet] | None = await get_all_tweets(session, limit)
+
+    assert tweets is not None
+    data: Dict[str, Any] = json.loads(build_get_tweets_json(rows, limit))
+
+    assert data == build_get_tweets_response(tweets, limit).model_dump()
+    assert list(data["tweets"][0]) == list(TweetBase.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_export_tweets(ac: AsyncClient) -> None:
+    """Тестирование потоковой выгрузки твитов по эндпоинту GET /api/tweets/export"""
+    response: Response = await ac.get("/tweets/export")
+    tweets: List[Dict[str, Any]] = [
+        json.loads(line) for line in response.text.splitlines()
+    ]
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert [t["content"] for t in tweets] == ["New tweet", "Second"]
+    assert tweets[0]["likes"] == [{"user_id": 1, "name": "Tony"}]
+
+    response = await ac.get("/tweets/export", params={"since_id": tweets[0]["id"]})
+
+    assert [json.loads(line)["content"] for line in response.text.splitlines()] == [
+        "Second",
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path, cursor",
+    [
+        ("/tweets", "broken"),
+        ("/tweets", encode_cursor((10**30, 1))),
+        ("/timeline", encode_cursor((1, -(2**31) - 1))),
+        ("/tweets/search?q=tweet", encode_cursor((1e300, 1))),
+        ("/tweets/search?q=tweet", encode_cursor((float("inf"), 1))),
+    ],
+)
+async def test_get_tweets_invalid_cursor(
+    ac: AsyncClient,
+    path: str,
+    cursor: str,
+) -> None:
+    """Тестирование невалидного курсора и курсора вне диапазона колонок"""
+    response: Response = await ac.get(path, params={"cursor": cursor})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_tweets_cached(ac: AsyncClient) -> None:
+    """
+    Тестирование кэша страниц ленты по эндпоинту GET /api/tweets
+    и его сброса при создании твита
+    """
+    first: Response = await ac.get("/tweets")
+    second: Response = await ac.get("/tweets")
+    metrics: Dict[str, Any] = (await ac.get("/metrics")).json()["metrics"]
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert metrics["feed_cache"]["hits"] > 0
+
+    response: Response = await ac.post("/tweets", json={"tweet_data": "Third"})
+    tweet_id: int = response.json()["tweet_id"]
+    response = await ac.get("/tweets")
+
+    assert tweet_id in [t["id"] for t in response.json()["tweets"]]
+    assert (await ac.delete(f"/tweets/{tweet_id}")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_get_tweets_cache_race(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование записи, зафиксированной между чтением страницы из базы
+    и ее сохранением в кэш: устаревшая страница не должна попасть в кэш
+    """
+    read_page = app_router.get_all_tweets_json
+
+    async def read_then_write(*args: Any, **kwargs: Any) -> Any:
+        rows = await read_page(*args, **kwargs)
+        invalidate("feed")
+        return rows
+
+    monkeypatch.setattr(app_router, "get_all_tweets_json", read_then_write)
+    feed_cache.clear()
+
+    response: Response = await ac.get("/tweets", params={"limit": 7})
+
+    assert response.json()["tweets"]
+    assert feed_cache.get((None, 7)) is None
+
+
+@pytest.mark.asyncio
+async def test_get_tweets_cache_like_during_read(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование отмены и повторного лайка, зафиксированных между чтением
+    страницы из базы и ее сохранением в кэш: страница отстает не больше
+    допустимого и сохраняется в кэш
+    """
+    read_page = app_router.get_all_tweets_json
+
+    async def read_then_like(*args: Any, **kwargs: Any) -> Any:
+        rows = await read_page(*args, **kwargs)
+        assert (await ac.delete("/tweets/1/likes")).status_code == 200
+        assert (await ac.post("/tweets/1/likes")).status_code == 201
+        return rows
+
+    monkeypatch.setattr(app_router, "get_all_tweets_json", read_then_like)
+    feed_cache.clear()
+
+    response: Response = await ac.get("/tweets", params={"limit": 7})
+
+    assert response.json()["tweets"]
+    assert feed_cache.get((None, 7)) == response.content
+
+
+@pytest.mark.asyncio
+async def test_search_tweets(ac: AsyncClient) -> None:
+    """
+    Тестирование полнотекстового поиска твитов
+    по эндпоинту GET /api/tweets/search
+    """
+    tweet_ids: List[int] = [
+        (await ac.post("/tweets", json={"tweet_data": content})).json()["tweet_id"]
+        for content in ("Morning coffee", "Coffee, more coffee!", "Evening tea")
+    ]
+
+    first: Response = await ac.get("/tweets/search", params={"q": "coffee", "limit": 1})
+    cursor: str = first.json()["next_cursor"]
+    second: Response = await ac.get(
+        "/tweets/search",
+        params={"q": "coffee", "limit": 1, "cursor": cursor},
+    )
+
+    assert [t["id"] for t in first.json()["tweets"]] == [tweet_ids[1]]
+    assert [t["id"] for t in second.json()["tweets"]] == [tweet_ids[0]]
+    assert second.json()["next_cursor"] is None
+    assert second.json()["tweets"][0]["author"] == {"id": 1, "name": "Tony"}
+
+    response: Response = await ac.get(
+        "/tweets/search",
+        params={"q": "coffee -morning"},
+    )
+    assert [t["id"] for t in response.json()["tweets"]] == [tweet_ids[1]]
+
+    response = await ac.get("/tweets/search", params={"q": "tea", "author_id": 2})
+    assert response.json()["tweets"] == []
+
+    response = await ac.get("/tweets/search", params={"q": "tea", "cursor": "x"})
+    assert response.status_code == 400
+
+    for tweet_id in tweet_ids:
+        assert (await ac.delete(f"/tweets/{tweet_id}")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_get_hashtag_tweets(ac: AsyncClient) -> None:
+    """
+    Тестирование хэштегов и упоминаний, сохраняемых при создании твита,
+    и эндпоинта GET /api/hashtags/{tag}/tweets
+    """
+    tweet_ids: List[int] = [
+        (await ac.post("/tweets", json={"tweet_data": content})).json()["tweet_id"]
+        for content in ("#Python with @Mike", "More #python #PYTHON, mail a@b.com")
+    ]
+
+    first: Response = await ac.get("/hashtags/python/tweets", params={"limit": 1})
+    second: Response = await ac.get(
+        "/hashtags/%23Python/tweets",
+        params={"limit": 1, "cursor": first.json()["next_cursor"]},
+    )
+
+    assert [t["id"] for t in first.json()["tweets"]] == [tweet_ids[1]]
+    assert [t["id"] for t in second.json()["tweets"]] == [tweet_ids[0]]
+    assert second.json()["next_cursor"] is None
+
+    async with async_session() as session:
+        mentions: List[str] = list(
+            await session.scalars(
+                select(Mention.name)
+                .join(TweetMention, TweetMention.mention_id == Mention.id)
+                .where(TweetMention.tweet_id.in_(tweet_ids)),
+            ),
+        )
+
+    assert mentions == ["mike"]
+
+    for tweet_id in tweet_ids:
+        assert (await ac.delete(f"/tweets/{tweet_id}")).status_code == 200
+
+    response: Response = await ac.get("/hashtags/python/tweets")
+    assert response.json()["tweets"] == []
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidation_listener() -> None:
+    """Тестирование инвалидации кэша по уведомлению от другого воркера"""
+    listener: InvalidationListener = InvalidationListener()
+    listener.start()
+
+    try:
+        await asyncio.wait_for(listener.connected.wait(), timeout=5)
+        feed_cache.set((None, 1), b"{}")
+
+        connection: asyncpg.Connection = await asyncpg.connect(LISTEN_DSN)
+        await connection.execute(
+            "SELECT pg_notify($1, $2)",
+            INVALIDATION_CHANNEL,
+            json.dumps({"cache": "feed", "keys": None, "older_than": None}),
+        )
+        await connection.close()
+
+        for _ in range(100):
+            if not len(feed_cache):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await listener.stop()
+
+    assert feed_cache.get((None, 1)) is None
+
+
+def test_cache_invalidation_own_notification() -> None:
+    """Тестирование пропуска уведомления, отправленного своим воркером"""
+    feed_cache.set((None, 1), b"{}")
+    handle_notification(
+        None,  # type: ignore[arg-type]
+        0,
+        INVALIDATION_CHANNEL,
+        json.dumps(build_invalidation("feed")),
+    )
+
+    assert feed_cache.get((None, 1)) == b"{}"
+    feed_cache.clear()
+
+
 @pytest.mark.asyncio
 async def test_delete_like_tweet(ac: AsyncClient) -> None:
     """
@@ -95,6 +637,251 @@ async def test_delete_like_tweet(ac: AsyncClient) -> None:
     assert data["result"] is True
 
 
+@pytest.mark.asyncio
+async def test_like_buffer(ac: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Тестирование отложенной записи лайков: переключения схлопываются,
+    а свои лайки видны в ленте до периодического сброса буфера
+    """
+    monkeypatch.setattr("src.api.router.LIKE_BUFFER_ENABLED", True)
+
+    methods: List[Callable[..., Awaitable[Response]]] = [ac.post, ac.delete, ac.post]
+    for method in methods:
+        assert (await method("/tweets/1/likes")).json()["result"] is True
+
+    response: Response = await ac.get("/tweets")
+    tweet: Dict[str, Any] = next(
+        t for t in response.json()["tweets"] if t["id"] == 1
+    )
+    metrics: Dict[str, Any] = (await ac.get("/metrics")).json()["metrics"]
+
+    assert tweet["likes"] == [{"user_id": 1, "name": "Tony"}]
+    assert metrics["like_buffer"]["pending"] == 0
+    assert metrics["like_buffer"]["coalesced"] >= 2
+
+    await ac.delete("/tweets/1/likes")
+    await ac.get("/tweets")
+
+    async with async_session() as session:
+        like_count: int | None = await session.scalar(
+            select(Tweet.like_count).where(Tweet.id == 1),
+        )
+
+    assert like_count is not None
+    assert like_count == 0
+
+
+@pytest.mark.asyncio
+async def test_like_buffer_read_not_coalesced(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование чтения ленты после сброса буфера лайков юзера:
+    чтение не присоединяется к чтению, начатому до сброса
+    """
+    monkeypatch.setattr("src.api.router.LIKE_BUFFER_ENABLED", True)
+    feed_cache.clear()
+    calls_before: int = single_flight_group.calls
+
+    await ac.post("/tweets/1/likes")
+    response: Response = await ac.get("/tweets")
+    tweet: Dict[str, Any] = next(
+        t for t in response.json()["tweets"] if t["id"] == 1
+    )
+
+    assert tweet["likes"] == [{"user_id": 1, "name": "Tony"}]
+    assert single_flight_group.calls == calls_before
+
+    await ac.get("/tweets", params={"limit": 3})
+
+    assert single_flight_group.calls == calls_before + 1
+
+    await ac.delete("/tweets/1/likes")
+    await ac.get("/tweets")
+
+
+@pytest.mark.asyncio
+async def test_like_buffer_flush_failed(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование чтения ленты при ошибке сброса буфера лайков:
+    лента отдается, лайк остается в буфере до следующего сброса
+    """
+
+    async def fail(*args: Any) -> None:
+        raise ConnectionError("database is unavailable")
+
+    monkeypatch.setattr("src.api.router.LIKE_BUFFER_ENABLED", True)
+    monkeypatch.setattr("src.api.likes_buffer.apply_like_toggles", fail)
+
+    await ac.post("/tweets/1/likes")
+    response: Response = await ac.get("/tweets")
+
+    assert response.status_code == 200
+    assert app_likes_buffer.like_buffer.has_pending("test")
+
+    monkeypatch.undo()
+    await app_likes_buffer.like_buffer.flush()
+
+    assert not app_likes_buffer.like_buffer.has_pending("test")
+
+    response = await ac.delete("/tweets/1/likes")
+
+    assert response.json()["result"] is True
+
+
+@pytest.mark.asyncio
+async def test_like_buffer_bad_pair(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование отбрасывания пары, которую база не примет:
+    id вне диапазона integer отклоняется эндпоинтом, а попавшая в буфер
+    такая пара не мешает записи остальных пар
+    """
+    monkeypatch.setattr("src.api.router.LIKE_BUFFER_ENABLED", True)
+
+    response: Response = await ac.post("/tweets/1099511627776/likes")
+
+    assert response.status_code == 422
+
+    buffer = app_likes_buffer.like_buffer
+    dropped_before: int = buffer.stats()["dropped"]
+    buffer.add("test", 1099511627776, True)
+    buffer.add("test", 1, True)
+    await buffer.flush()
+
+    async with async_session() as session:
+        like_count: int | None = await session.scalar(
+            select(Tweet.like_count).where(Tweet.id == 1),
+        )
+
+    assert like_count is not None
+    assert like_count == 1
+    assert not buffer.has_pending("test")
+    assert buffer.stats()["dropped"] == dropped_before + 1
+
+    monkeypatch.undo()
+    await ac.delete("/tweets/1/likes")
+
+
+@pytest.mark.asyncio
+async def test_get_trending(ac: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Тестирование популярных твитов и хэштегов по эндпоинту GET /api/trending
+    """
+    service: TrendingService = TrendingService(window_hours=24, top_k=10, interval=10)
+    monkeypatch.setattr("src.api.trending.trending", service)
+    monkeypatch.setattr("src.api.router.trending", service)
+
+    await ac.post("/tweets/1/likes")
+    response: Response = await ac.post("/tweets", json={"tweet_data": "#Trend #x"})
+    tweet_id: int = response.json()["tweet_id"]
+    service.refresh()
+
+    response = await ac.get("/trending")
+
+    assert response.json() == {
+        "result": True,
+        "tweets": [{"id": 1, "likes": 1}],
+        "hashtags": [{"tag": "x", "count": 1}, {"tag": "trend", "count": 1}],
+    }
+
+    await ac.delete("/tweets/1/likes")
+    await ac.delete(f"/tweets/{tweet_id}")
+    service.refresh()
+
+    response = await ac.get("/trending")
+
+    assert response.json()["tweets"] == []
+    assert response.json()["hashtags"] == []
+
+
+@pytest.mark.asyncio
+async def test_trending_notification(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование рассылки приращений популярного другим воркерам:
+    лайк публикует уведомление, уведомление другого воркера применяется,
+    уведомление своего воркера пропускается
+    """
+    service: TrendingService = TrendingService(window_hours=24, top_k=10, interval=10)
+    monkeypatch.setattr("src.api.trending.trending", service)
+    payloads: asyncio.Queue = asyncio.Queue()
+
+    connection: asyncpg.Connection = await asyncpg.connect(LISTEN_DSN)
+    await connection.add_listener(
+        TRENDING_CHANNEL,
+        lambda *args: payloads.put_nowait(args[3]),
+    )
+    try:
+        await ac.post("/tweets/1/likes")
+        payload: str = await asyncio.wait_for(payloads.get(), timeout=5)
+    finally:
+        await connection.close()
+
+    await ac.delete("/tweets/1/likes")
+    message: Dict[str, Any] = json.loads(payload)
+    handle_notification(None, 0, TRENDING_CHANNEL, payload)
+    service.refresh()
+
+    assert message["likes"] == [[1, 1]]
+    assert service.top_tweets == []
+
+    message["sender"] = "other-worker"
+    handle_notification(None, 0, TRENDING_CHANNEL, json.dumps(message))
+    service.refresh()
+
+    assert service.top_tweets == [(1, 1)]
+
+
+@pytest.mark.asyncio
+async def test_trending_many_hashtags(
+    ac: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Тестирование создания и удаления твита с хэштегами, приращения которых
+    не помещаются в одно уведомление
+    """
+    service: TrendingService = TrendingService(window_hours=24, top_k=10, interval=10)
+    monkeypatch.setattr("src.api.trending.trending", service)
+    content: str = " ".join(f"#tag{number:04}" for number in range(600))
+
+    response: Response = await ac.post("/tweets", json={"tweet_data": content})
+    tweet_id: int = response.json()["tweet_id"]
+    service.refresh()
+
+    assert response.status_code == 201
+    assert len(service.hashtags.totals()) == 600
+    assert (await ac.delete(f"/tweets/{tweet_id}")).status_code == 200
+
+    service.refresh()
+
+    assert service.top_hashtags == []
+
+
+def test_sliding_window_counter() -> None:
+    """Тестирование сворачивания минутных корзин в часовые и окна счетчика"""
+    counter: SlidingWindowCounter = SlidingWindowCounter(window_hours=2)
+    start: float = 1_000_000 * 3600
+
+    counter.add("a", now=start)
+    counter.add("a", now=start + 30 * 60)
+    counter.add("b", 2, now=start + 90 * 60)
+
+    assert counter.totals(now=start + 90 * 60) == {"a": 2, "b": 2}
+    assert counter.stats() == {"minute_buckets": 1, "hour_buckets": 1}
+    assert counter.totals(now=start + 3 * 3600) == {"b": 2}
+    assert counter.totals(now=start + 4 * 3600) == {}
+
+
 @pytest.mark.asyncio
 async def test_delete_tweet(ac: AsyncClient) -> None:
     """Тестирование удаления твита по эндпоинту DELETE /api/tweets/{id}"""
@@ -106,6 +893,32 @@ async def test_delete_tweet(ac: AsyncClient) -> None:
     assert data["result"] is True
 
 
+@pytest.mark.asyncio
+async def test_delete_tweet_releases_media(ac: AsyncClient) -> None:
+    """
+    Тестирование удаления файла с диска после удаления последней ссылки на него
+    по эндпоинту DELETE /api/tweets/{id}
+    """
+    with open("tests/test_files/test_image_1.png", mode="rb") as file:
+        sha256: str = hashlib.sha256(file.read()).hexdigest()
+    blob_path: str = f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    response: Response = await ac.post(
+        "/tweets",
+        json={"tweet_data": "Tweet with media", "tweet_media_ids": [2]},
+    )
+    tweet_id: int = response.json()["tweet_id"]
+    assert os.path.exists(f"{FILE_DIR}/{blob_path}")
+    assert os.path.exists(f"{FILE_DIR}/variants/{blob_path}_64.webp")
+
+    response = await ac.delete(f"/tweets/{tweet_id}")
+
+    assert response.status_code == 200
+    assert (await ac.get("/medias/2")).status_code == 404
+    assert not os.path.exists(f"{FILE_DIR}/{blob_path}")
+    assert not os.path.exists(f"{FILE_DIR}/variants/{blob_path}_64.webp")
+
+
 @pytest.mark.asyncio
 async def test_follow_user(ac: AsyncClient) -> None:
     """
@@ -118,9 +931,13 @@ async def test_follow_user(ac: AsyncClient) -> None:
     assert response.status_code == 201
     assert data["result"] is True
 
+    response = await ac.post(f"/users/{user_id}/follow")
+
+    assert response.status_code == 201
+
 
 @pytest.mark.asyncio
-async def test_get_user_me(ac: AsyncClient) -> None:
+async def test_get_user_me(ac: AsyncClient, no_lazy_loads: List[str]) -> None:
     """Тестирование получения своего профиля по эндпоинту GET /api/users/me"""
     expected: Dict[str, Any] = {
         "result": True,
@@ -129,6 +946,10 @@ async def test_get_user_me(ac: AsyncClient) -> None:
             "name": "Tony",
             "followers": [],
             "following": [{"id": 2, "name": "Mike"}],
+            "followers_count": 0,
+            "following_count": 1,
+            "followers_next_cursor": None,
+            "following_next_cursor": None,
         },
     }
 
@@ -140,7 +961,7 @@ async def test_get_user_me(ac: AsyncClient) -> None:
 
 
 @pytest.mark.asyncio
-async def test_get_user_by_id(ac: AsyncClient) -> None:
+async def test_get_user_by_id(ac: AsyncClient, no_lazy_loads: List[str]) -> None:
     """Тестирование получения юзера по эндпоинту GET /api/users/{id}"""
     user_id: int = 2
     expected: Dict[str, Any] = {
@@ -150,6 +971,10 @@ async def test_get_user_by_id(ac: AsyncClient) -> None:
             "name": "Mike",
             "followers": [{"id": 1, "name": "Tony"}],
             "following": [],
+            "followers_count": 1,
+            "following_count": 0,
+            "followers_next_cursor": None,
+            "following_next_cursor": None,
         },
     }
 
@@ -160,6 +985,92 @@ async def test_get_user_by_id(ac: AsyncClient) -> None:
     assert data == expected
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path,names",
+    [("/users/2/followers", ["Tony"]), ("/users/1/following", ["Mike"])],
+)
+async def test_get_user_follows(ac: AsyncClient, path: str, names: List[str]) -> None:
+    """
+    Тестирование получения страниц подписчиков и подписок
+    по эндпоинтам GET /api/users/{id}/followers и GET /api/users/{id}/following
+    """
+    response: Response = await ac.get(path, params={"limit": 1})
+    data: Dict[str, Any] = response.json()
+
+    assert response.status_code == 200
+    assert [u["name"] for u in data["users"]] == names
+    assert data["next_cursor"] is None
+
+    response = await ac.get("/users/100/followers")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_timeline(ac: AsyncClient, no_lazy_loads: List[str]) -> None:
+    """
+    Тестирование раскладки твита в ленту подписчика
+    по эндпоинту GET /api/timeline
+    """
+    response: Response = await ac.post(
+        "/tweets",
+        json={"tweet_data": "Mike's tweet"},
+        headers={"api-key": "test2"},
+    )
+    assert response.status_code == 201
+
+    response = await ac.get("/timeline")
+    data: Dict[str, Any] = response.json()
+
+    assert response.status_code == 200
+    assert [t["content"] for t in data["tweets"]] == ["Mike's tweet", "Second"]
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_user_single_flight() -> None:
+    """Тестирование объединения одинаковых одновременных запросов юзера"""
+    coalesced_before: int = single_flight_group.coalesced
+
+    async with async_session() as first, async_session() as second:
+        users: List[UserProfile | None] = await asyncio.gather(
+            get_user_with_followers_and_following_by_id(first, 2),
+            get_user_with_followers_and_following_by_id(second, 2),
+        )
+
+    assert users[0] is not None
+    assert users[0] is users[1]
+    assert [row.name for row in users[0].followers] == ["Tony"]
+    assert single_flight_group.coalesced == coalesced_before + 1
+
+
+@pytest.mark.asyncio
+async def test_get_user_single_flight_leader_cancelled() -> None:
+    """
+    Тестирование объединенного запроса юзера при отмене первого вызова
+    и закрытии его сессии
+    """
+    async with async_session() as first, async_session() as second:
+        leader: asyncio.Future = asyncio.ensure_future(
+            get_user_with_followers_and_following_by_id(first, 2),
+        )
+        await asyncio.sleep(0)
+        follower: asyncio.Future = asyncio.ensure_future(
+            get_user_with_followers_and_following_by_id(second, 2),
+        )
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await first.close()
+        profile: UserProfile | None = await follower
+
+    assert leader.cancelled()
+    assert profile is not None
+    assert profile.user.id == 2
+    assert [row.name for row in profile.followers] == ["Tony"]
+
+
 @pytest.mark.asyncio
 async def test_unfollow_user(ac: AsyncClient) -> None:
     """
@@ -171,3 +1082,26 @@ async def test_unfollow_user(ac: AsyncClient) -> None:
 
     assert response.status_code == 200
     assert data["result"] is True
+
+
+@pytest.mark.asyncio
+async def test_get_timeline_after_unfollow(ac: AsyncClient) -> None:
+    """
+    Тестирование очистки ленты после отписки по эндпоинту GET /api/timeline
+    """
+    response: Response = await ac.get("/timeline")
+    data: Dict[str, Any] = response.json()
+
+    assert response.status_code == 200
+    assert [t["content"] for t in data["tweets"]] == ["Second"]
+
+
+@pytest.mark.asyncio
+async def test_get_metrics(ac: AsyncClient) -> None:
+    """Тестирование получения метрик по эндпоинту GET /api/metrics"""
+    response: Response = await ac.get("/metrics")
+    data: Dict[str, Any] = response.json()
+
+    assert response.status_code == 200
+    assert data["metrics"]["api_key_cache"]["hits"] > 0
+    assert data["metrics"]["media_cache"]["hits"] > 0